@@ -7,18 +7,37 @@ import subprocess
 import webbrowser
 import platform
 from datetime import datetime
+from concurrent.futures.process import BrokenProcessPool
 
 import fitz  # PyMuPDF
 import pandas as pd
 import streamlit as st
 
-from ltv_map import region_map
+from ltv_map import region_map, region_options
+from rerun_profiler import profiling_enabled, start_rerun_profiler, finish_rerun_profiler
+from shared_cache import cache_stats
+from ltv_report import (
+    parse_korean_number,
+    select_ltv_ratios,
+    valid_loan_items,
+    calculate_limits,
+    build_result_text,
+    calculate_fees,
+)
+from pdf_utils import pdf_hash, process_pdf_bytes, process_pdfs_concurrently
+from notion_mirror import (
+    LIST_LIMIT,
+    get_last_synced_at,
+    list_mirrored_customers,
+    search_mirrored_customers,
+    count_mirrored_customers,
+)
 from history_manager import (
     get_customer_options,
     load_customer_input,
     cleanup_old_history,
-    search_customers_by_keyword
-    # 🔴 ARCHIVE_FILE 제거! 더 이상 필요 없음
+    search_customers_by_keyword,
+    export_archive_csv,
 )
 
 # ─────────────────────────────
@@ -33,69 +52,13 @@ st.set_page_config(
     initial_sidebar_state="auto"
 )
 
-# ------------------------------
-# 🔹 텍스트 기반 추출 함수들
-# ------------------------------
-
-def extract_address(text):
-    m = re.search(r"\[집합건물\]\s*([^\n]+)", text)
-    if m:
-        return m.group(1).strip()
-    m = re.search(r"소재지\s*[:：]?\s*([^\n]+)", text)
-    if m:
-        return m.group(1).strip()
-    return ""
-
-def extract_area_floor(text):
-    m = re.findall(r"(\d+\.\d+)\s*㎡", text.replace('\n', ' '))
-    area = f"{m[-1]}㎡" if m else ""
-    floor = None
-    addr = extract_address(text)
-    f_match = re.findall(r"제(\d+)층", addr)
-    if f_match:
-        floor = int(f_match[-1])
-    return area, floor
-
-def extract_all_names_and_births(text):
-    start = text.find("주요 등기사항 요약")
-    if start == -1:
-        return []
-    summary = text[start:]
-    lines = [l.strip() for l in summary.splitlines() if l.strip()]
-    result = []
-    for i in range(len(lines)):
-        if re.match(r"[가-힣]+ \(공유자\)|[가-힣]+ \(소유자\)", lines[i]):
-            name = re.match(r"([가-힣]+)", lines[i]).group(1)
-            if i + 1 < len(lines):
-                birth_match = re.match(r"(\d{6})-", lines[i + 1])
-                if birth_match:
-                    birth = birth_match.group(1)
-                    result.append((name, birth))
-    return result
-
-# ------------------------------
-# 🔹 PDF 처리 함수
-# ------------------------------
-
-def process_pdf(uploaded_file):
-    doc = fitz.open(stream=uploaded_file.read(), filetype="pdf")
-    text = ""
-    external_links = []
-
-    for page in doc:
-        text += page.get_text("text")
-        links = page.get_links()
-        for link in links:
-            if "uri" in link:
-                external_links.append(link["uri"])
-
-    doc.close()
-
-    address = extract_address(text)
-    area, floor = extract_area_floor(text)
-    co_owners = extract_all_names_and_births(text)
-
-    return text, external_links, address, area, floor, co_owners
+# 🔬 선택적 rerun 프로파일링 (환경변수 LTV_PROFILE=1 또는 URL ?profile=1)
+# 예외로 중간에 끝난 rerun 도 저장되며, 그때는 직전 rerun 의 문서 해시/고객명으로 태그
+rerun_profiler = start_rerun_profiler(
+    st.query_params,
+    upload_hash=st.session_state.get("uploaded_pdf_hash"),
+    customer=st.session_state.get("customer_name", "").strip(),
+)
 
 # ------------------------------
 # 🔹 유틸 함수
@@ -122,25 +85,6 @@ def format_with_comma(key):
     else:
         st.session_state[key] = ""
 
-def parse_korean_number(text: str) -> int:
-    txt = text.replace(",", "").strip()
-    total = 0
-    m = re.search(r"(\d+)\s*억", txt)
-    if m:
-        total += int(m.group(1)) * 10000
-    m = re.search(r"(\d+)\s*천만", txt)
-    if m:
-        total += int(m.group(1)) * 1000
-    m = re.search(r"(\d+)\s*만", txt)
-    if m:
-        total += int(m.group(1))
-    if total == 0:
-        try:
-            total = int(txt)
-        except:
-            total = 0
-    return total
-
 def format_kb_price():
     raw = st.session_state.get("raw_price_input", "")
     clean = parse_korean_number(raw)
@@ -151,17 +95,6 @@ def format_area():
     clean = re.sub(r"[^\d.]", "", raw)
     st.session_state["extracted_area"] = f"{clean}㎡" if clean else ""
 
-def calculate_ltv(total_value, deduction, principal_sum, maintain_maxamt_sum, ltv, is_senior=True):
-    if is_senior:
-        limit = int(total_value * (ltv / 100) - deduction)
-        available = int(limit - principal_sum)
-    else:
-        limit = int(total_value * (ltv / 100) - maintain_maxamt_sum - deduction)
-        available = int(limit - principal_sum)
-    limit = (limit // 10) * 10
-    available = (available // 10) * 10
-    return limit, available
-
 
 # ------------------------------
 # 🔹 세션 초기화
@@ -171,23 +104,137 @@ for key in ["extracted_address", "extracted_area", "raw_price", "co_owners", "ex
     if key not in st.session_state:
         st.session_state[key] = "" if key != "co_owners" else []
 
-uploaded_file = st.file_uploader("📎 PDF 파일 업로드", type="pdf")
-
-if uploaded_file:
+multi_pdf_mode = st.checkbox("📚 여러 PDF 동시 업로드", key="multi_pdf_mode")
+
+pdf_bytes = None
+pdf_result = None
+
+if multi_pdf_mode:
+    uploaded_files = st.file_uploader("📎 PDF 파일 업로드 (여러 개)", type="pdf", accept_multiple_files=True)
+
+    if uploaded_files:
+        # 파일 내용 해시 기준으로 파싱 결과/실패 캐시 (rerun 시 재파싱 방지)
+        if "pdf_results" not in st.session_state:
+            st.session_state["pdf_results"] = {}
+        if "pdf_errors" not in st.session_state:
+            st.session_state["pdf_errors"] = {}
+        pdf_results = st.session_state["pdf_results"]
+        pdf_errors = st.session_state["pdf_errors"]
+
+        files = {f"{i + 1}. {f.name}": f.getvalue() for i, f in enumerate(uploaded_files)}
+        hashes = {name: pdf_hash(data) for name, data in files.items()}
+        status = {}
+        for name in files:
+            if hashes[name] in pdf_results:
+                status[name] = "✅ 완료"
+            elif hashes[name] in pdf_errors:
+                status[name] = f"❌ 오류: {pdf_errors[hashes[name]]}"
+            else:
+                status[name] = "⏳ 처리중"
+
+        def render_pdf_table():
+            rows_view = []
+            for name in files:
+                result = pdf_results.get(hashes[name])
+                rows_view.append({
+                    "파일": name,
+                    "상태": status[name],
+                    "주소": result[2] if result else "",
+                    "전용면적": result[3] if result else "",
+                    "소유자": ", ".join(n for n, _ in result[5]) if result else "",
+                    "근저당": f"{len(result[6])}건" if result else "",
+                })
+            table_box.dataframe(pd.DataFrame(rows_view), width="stretch", hide_index=True)
+
+        table_box = st.empty()
+        render_pdf_table()
+
+        # 1. 아직 파싱되지 않은 문서만 워커 풀에서 병렬 처리, 끝나는 대로 표 갱신
+        pending = [
+            (name, files[name]) for name in files
+            if hashes[name] not in pdf_results and hashes[name] not in pdf_errors
+        ]
+        if pending:
+            progress = st.progress(0.0, text=f"PDF 분석 중... 0/{len(pending)}")
+            for done, (name, result, error) in enumerate(process_pdfs_concurrently(pending), start=1):
+                if error is None:
+                    pdf_results[hashes[name]] = result
+                    status[name] = "✅ 완료"
+                else:
+                    status[name] = f"❌ 오류: {error}"
+                    # 손상된 문서는 다시 시도하지 않음 (워커 풀 장애는 다음 rerun 에 재시도)
+                    if not isinstance(error, BrokenProcessPool):
+                        pdf_errors[hashes[name]] = str(error)
+                render_pdf_table()
+                progress.progress(done / len(pending), text=f"PDF 분석 중... {done}/{len(pending)}")
+            progress.empty()
+
+        # 2. 계산기에 사용할 문서 선택
+        ready = [name for name in files if hashes[name] in pdf_results]
+        if ready:
+            selected_pdf = st.selectbox("🧮 계산기에 사용할 문서", ready, key="selected_pdf")
+            pdf_bytes = files[selected_pdf]
+            pdf_result = pdf_results[hashes[selected_pdf]]
+else:
+    uploaded_file = st.file_uploader("📎 PDF 파일 업로드", type="pdf")
+
+    if uploaded_file:
+        pdf_bytes = uploaded_file.getvalue()
+        # 여러 PDF 모드와 같은 해시 캐시 사용 → 위젯 조작마다 재파싱하지 않음
+        if "pdf_results" not in st.session_state:
+            st.session_state["pdf_results"] = {}
+        if "pdf_errors" not in st.session_state:
+            st.session_state["pdf_errors"] = {}
+        current_hash = pdf_hash(pdf_bytes)
+        if current_hash not in st.session_state["pdf_results"] and current_hash not in st.session_state["pdf_errors"]:
+            try:
+                st.session_state["pdf_results"][current_hash] = process_pdf_bytes(pdf_bytes)
+            except Exception as e:
+                st.session_state["pdf_errors"][current_hash] = str(e)
+        pdf_result = st.session_state["pdf_results"].get(current_hash)
+        if current_hash in st.session_state["pdf_errors"]:
+            st.error(f"❌ PDF 분석 오류: {st.session_state['pdf_errors'][current_hash]}")
+
+if pdf_result:
     # 1. PDF 텍스트 추출 및 메타정보 세션 저장
-    text, external_links, address, area, floor, co_owners = process_pdf(uploaded_file)
+    text, external_links, address, area, floor, co_owners, mortgages = pdf_result
     st.session_state["extracted_address"] = address
     st.session_state["extracted_area"] = area
     st.session_state["extracted_floor"] = floor
     st.session_state["co_owners"] = co_owners
     st.success(f"📍 PDF에서 주소 추출: {address}")
 
-    # 2. 임시 PDF 파일 저장 (한번만)
-    if "uploaded_pdf_path" not in st.session_state:
-        uploaded_file.seek(0)
+    # 2. 임시 PDF 파일 저장 (문서가 바뀔 때만)
+    current_pdf_hash = pdf_hash(pdf_bytes)
+    if st.session_state.get("uploaded_pdf_hash") != current_pdf_hash:
+        # 이전 문서의 임시 파일 정리
+        previous_pdf_path = st.session_state.get("uploaded_pdf_path")
+        if previous_pdf_path and os.path.exists(previous_pdf_path):
+            os.remove(previous_pdf_path)
         with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-            tmp_file.write(uploaded_file.getbuffer())
+            tmp_file.write(pdf_bytes)
             st.session_state["uploaded_pdf_path"] = tmp_file.name
+        st.session_state["uploaded_pdf_hash"] = current_pdf_hash
+        st.session_state.page_index = 0
+
+        # 등기부 을구의 유효 근저당권으로 대출 항목 다시 채우기 (문서가 바뀔 때마다, 근저당권이 없으면 비움)
+        loaded_mortgages = mortgages[:10]  # 대출 항목 입력칸 최대 개수
+        for i in range(10):
+            for key in (f"lender_{i}", f"maxamt_{i}", f"status_{i}"):
+                st.session_state.pop(key, None)
+            st.session_state[f"manual_principal_{i}"] = False
+        st.session_state["rows"] = len(loaded_mortgages)
+        for i, mortgage in enumerate(loaded_mortgages):
+            st.session_state[f"lender_{i}"] = mortgage["설정자"]
+            st.session_state[f"maxamt_{i}"] = f"{mortgage['채권최고액']:,}"
+            st.session_state[f"status_{i}"] = "유지"
+        if len(mortgages) > len(loaded_mortgages):
+            st.warning(
+                f"🏦 등기부의 근저당권 {len(mortgages)}건 중 {len(loaded_mortgages)}건만 불러왔습니다 "
+                f"(대출 항목은 최대 {len(loaded_mortgages)}건). 나머지는 직접 확인해 주세요."
+            )
+        elif mortgages:
+            st.info(f"🏦 등기부에서 근저당권 {len(mortgages)}건을 불러왔습니다.")
 
     pdf_path = st.session_state["uploaded_pdf_path"]
     doc = fitz.open(pdf_path)
@@ -228,6 +275,54 @@ if uploaded_file:
         for uri in external_links:
             st.code(uri)
 
+# ------------------------------
+# 🔹 Notion 고객 DB (로컬 미러)
+# ------------------------------
+with st.sidebar:
+    st.markdown("### 🗂️ Notion 고객 DB")
+    if st.button("🔄 Notion 동기화", key="notion_sync_button"):
+        from notion_utils import sync_notion_mirror
+        ok, synced = sync_notion_mirror()
+        if ok:
+            st.success(f"✅ 변경된 {synced}건을 동기화했습니다.")
+        else:
+            st.warning("⚠️ Notion에 연결할 수 없어 로컬 데이터로 조회합니다.")
+
+    last_synced_at = get_last_synced_at()
+    st.caption(f"마지막 동기화: {last_synced_at or '없음'}")
+
+    notion_keyword = st.text_input("고객명/주소 검색", key="notion_search_keyword")
+
+    # 최근 순으로 LIST_LIMIT 건씩 페이지 단위 조회
+    notion_total = count_mirrored_customers(notion_keyword)
+    notion_pages = max((notion_total - 1) // LIST_LIMIT + 1, 1)
+    if st.session_state.get("notion_page", 1) > notion_pages:
+        st.session_state["notion_page"] = 1
+    notion_page = 1
+    if notion_pages > 1:
+        notion_page = st.number_input(f"페이지 (전체 {notion_total}건)", min_value=1, max_value=notion_pages, key="notion_page")
+    offset = (notion_page - 1) * LIST_LIMIT
+    if notion_keyword:
+        mirrored = search_mirrored_customers(notion_keyword, offset=offset)
+    else:
+        mirrored = list_mirrored_customers(offset=offset)
+    if mirrored:
+        st.dataframe(
+            pd.DataFrame(mirrored)[["name", "address", "saved_at"]].rename(
+                columns={"name": "고객명", "address": "주소", "saved_at": "저장시간"}
+            ),
+            width="stretch",
+            hide_index=True,
+        )
+
+    # 🧠 공유 캐시 상태 (진단 모드에서만 표시)
+    if profiling_enabled(st.query_params):
+        stats = cache_stats()
+        st.caption(
+            f"🧠 캐시 {stats['entries']}개 · {stats['bytes'] / 2**20:.1f}/{stats['max_bytes'] / 2**20:.0f}MB · "
+            f"적중 {stats['hits']} / 미스 {stats['misses']} ({stats['hit_rate']:.0%}) · 제거 {stats['evictions']}"
+        )
+
 # ------------------------------
 # 🔹 주소 및 고객명 UI
 # ------------------------------
@@ -244,14 +339,19 @@ if selected_from_list:
 
 with row1_col3:
     if st.session_state.get("deleted_data_ready", False):
-        if os.path.exists(ARCHIVE_FILE):
-            with open(ARCHIVE_FILE, "rb") as f:
-                st.download_button(
-                    label="📥 삭제된 이력 다운로드",
-                    data=f,
-                    file_name=ARCHIVE_FILE,
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
+        archive_range = st.date_input("삭제 이력 기간", value=(), key="archive_range")
+        archive_start = archive_range[0] if len(archive_range) > 0 else None
+        archive_end = archive_range[1] if len(archive_range) > 1 else archive_start
+        # 버튼을 누를 때만 세그먼트를 읽어 CSV 생성
+        if st.button("📦 삭제 이력 내보내기", key="archive_export_button"):
+            st.session_state["archive_export"] = export_archive_csv(archive_start, archive_end)
+        if st.session_state.get("archive_export"):
+            st.download_button(
+                label="📥 삭제된 이력 다운로드",
+                data=st.session_state["archive_export"],
+                file_name="ltv_archive_deleted.csv",
+                mime="text/csv"
+            )
 # ------------------------------
 # 🔹 기본 정보 입력
 # ------------------------------
@@ -268,13 +368,19 @@ with info_col2:
     customer_name = st.text_input("고객명", default_name_text, key="customer_name")
 
 
+# 지역을 바꾸면 방공제 금액을 그 지역 기본값으로 재설정
+def on_region_change():
+    st.session_state["manual_d"] = f"{region_map.get(st.session_state['region'], 0):,}"
+
 col1, col2 = st.columns(2)
 with col1:
-    region = st.selectbox("방공제 지역 선택", [""] + list(region_map.keys()))
+    region = st.selectbox("방공제 지역 선택", region_options, key="region", on_change=on_region_change)
     default_d = region_map.get(region, 0)
 
 with col2:
-    manual_d = st.text_input("방공제 금액 (만)", f"{default_d:,}")
+    if "manual_d" not in st.session_state:
+        st.session_state["manual_d"] = f"{default_d:,}"
+    manual_d = st.text_input("방공제 금액 (만)", key="manual_d")
 
 col3, col4 = st.columns(2)
 with col3:
@@ -337,27 +443,21 @@ st.subheader("📌 LTV 비율 입력")
 ltv_col1, ltv_col2 = st.columns(2)
 
 with ltv_col1:
-    raw_ltv1 = st.text_input("LTV 비율 ① (%)", "80")
+    raw_ltv1 = st.text_input("LTV 비율 ① (%)", "80", key="ltv1")
 
 with ltv_col2:
-    raw_ltv2 = st.text_input("LTV 비율 ② (%)", "")
+    raw_ltv2 = st.text_input("LTV 비율 ② (%)", "", key="ltv2")
 
 # 선택값 정리
-ltv_selected = []
-for val in [raw_ltv1, raw_ltv2]:
-    try:
-        v = int(val)
-        if 1 <= v <= 100:
-            ltv_selected.append(v)
-    except:
-        continue
-ltv_selected = list(dict.fromkeys(ltv_selected))  # 중복 제거
+ltv_selected = select_ltv_ratios([raw_ltv1, raw_ltv2])
 
 # ------------------------------
 # 🔹 대출 항목 입력
 # ------------------------------
 
-rows = st.number_input("대출 항목", min_value=0, max_value=10, value=3)
+if "rows" not in st.session_state:
+    st.session_state["rows"] = 3
+rows = st.number_input("대출 항목", min_value=0, max_value=10, key="rows")
 items = []
 
 def format_with_comma(key):
@@ -430,104 +530,23 @@ for i in range(rows):
 
 total_value = parse_korean_number(raw_price_input)
 
-# ✅ 항상 초기화: 이후 오류 방지
-limit_senior_dict = {}
-limit_sub_dict = {}
-valid_items = []
-
-# ✅ 항상 초기화 (rows == 0 에도 필요)
-sum_dh = 0
-sum_sm = 0
-sum_maintain = 0
-sum_sub_principal = 0
-
 if int(rows) == 0:
     st.markdown("### 📌 대출 항목이 없으므로 선순위 최대 LTV만 계산합니다")
-    for ltv in ltv_selected:
-        limit = int(total_value * (ltv / 100) - deduction)
-        limit = (limit // 10) * 10
-        limit_senior_dict[ltv] = (limit, limit)
-else:
-    # 진행구분별 합계 계산
-    sum_dh = sum(
-        int(re.sub(r"[^\d]", "", item.get("원금", "0")) or 0)
-        for item in items if item.get("진행구분") == "대환"
-    )
-    sum_sm = sum(
-        int(re.sub(r"[^\d]", "", item.get("원금", "0")) or 0)
-        for item in items if item.get("진행구분") == "선말소"
-    )
-    sum_maintain = sum(
-        int(re.sub(r"[^\d]", "", item.get("채권최고액", "0")) or 0)
-        for item in items if item.get("진행구분") == "유지"
-    )
-    sum_sub_principal = sum(
-        int(re.sub(r"[^\d]", "", item.get("원금", "0")) or 0)
-        for item in items if item.get("진행구분") not in ["유지"]
-    )
-
-    # 유효 항목만 필터링
-    valid_items = [item for item in items if any([
-        item.get("설정자", "").strip(),
-        re.sub(r"[^\d]", "", item.get("채권최고액", "") or "0") != "0",
-        re.sub(r"[^\d]", "", item.get("원금", "") or "0") != "0"
-    ])]
 
-
-    # ✅ LTV 계산 함수
-    def calculate_ltv(total_value, deduction, principal_sum, maintain_maxamt_sum, ltv, is_senior=True):
-        if is_senior:
-            limit = int(total_value * (ltv / 100) - deduction)
-            available = int(limit - principal_sum)
-        else:
-            limit = int(total_value * (ltv / 100) - maintain_maxamt_sum - deduction)
-            available = int(limit - principal_sum)
-        limit = (limit // 10) * 10
-        available = (available // 10) * 10
-        return limit, available
-
-    for ltv in ltv_selected:
-        if sum_maintain > 0:
-            limit_sub_dict[ltv] = calculate_ltv(total_value, deduction, sum_sub_principal, sum_maintain, ltv, is_senior=False)
-        else:
-            limit_senior_dict[ltv] = calculate_ltv(total_value, deduction, sum_dh + sum_sm, 0, ltv, is_senior=True)
+valid_items = valid_loan_items(items)
+limit_senior_dict, limit_sub_dict, (sum_dh, sum_sm, sum_maintain, sum_sub_principal) = calculate_limits(
+    total_value, deduction, items, ltv_selected
+)
 
 
 # ------------------------------
 # 🔹 결과 출력
 # ------------------------------
 
-text_to_copy = f"고객명 : {customer_name}\n주소 : {address_input}\n"
-type_of_price = "하안가" if floor_num and floor_num <= 2 else "일반가"
-text_to_copy += f"{type_of_price} | KB시세: {raw_price_input} | 전용면적 : {area_input} | 방공제 금액 : {deduction:,}만\n"
-
-if valid_items:
-    text_to_copy += "\n대출 항목\n"
-    for item in valid_items:
-        raw_max = re.sub(r"[^\d]", "", item.get("채권최고액", "0"))
-        max_amt = int(raw_max) if raw_max else 0
-
-        raw_principal = re.sub(r"[^\d]", "", item.get("원금", "0"))
-        principal_amt = int(raw_principal) if raw_principal else 0
-
-        text_to_copy += f"{item.get('설정자', '')} | 채권최고액: {max_amt:,} | 비율: {item.get('설정비율', '0')}% | 원금: {principal_amt:,} | {item.get('진행구분', '')}\n"
-
-
-for ltv in ltv_selected:
-    if ltv in limit_senior_dict:
-        limit, avail = limit_senior_dict[ltv]
-        text_to_copy += f"\n선순위 LTV {ltv}% {limit:,} 가용 {avail:,}"
-    if ltv in limit_sub_dict:
-        limit, avail = limit_sub_dict[ltv]
-        text_to_copy += f"\n후순위 LTV {ltv}% {limit:,} 가용 {avail:,}"
-
-
-# ✅ 항상 안전하게 동작
-text_to_copy += "\n진행구분별 원금 합계\n"
-if sum_dh > 0:
-    text_to_copy += f"대환: {sum_dh:,}만\n"
-if sum_sm > 0:
-    text_to_copy += f"선말소: {sum_sm:,}만\n"
+text_to_copy = build_result_text(
+    customer_name, address_input, floor_num, raw_price_input, area_input, deduction,
+    valid_items, ltv_selected, limit_senior_dict, limit_sub_dict, sum_dh, sum_sm,
+)
 
 st.text_area("결과 내용", value=text_to_copy, height=320)
 
@@ -557,19 +576,17 @@ with col1:
     consult_amount = parse_comma_number(consult_input)
 
 with col2:
-    consult_rate = st.number_input("컨설팅 수수료율 (%)", min_value=0.0, value=1.5, step=0.1, format="%.1f")
+    consult_rate = st.number_input("컨설팅 수수료율 (%)", min_value=0.0, value=1.5, step=0.1, format="%.1f", key="consult_rate")
 
 with col3:
     bridge_input = st.text_input("브릿지 금액 (만원)", "", key="bridge_amt")
     bridge_amount = parse_comma_number(bridge_input)
 
 with col4:
-    bridge_rate = st.number_input("브릿지 수수료율 (%)", min_value=0.0, value=0.7, step=0.1, format="%.1f")
+    bridge_rate = st.number_input("브릿지 수수료율 (%)", min_value=0.0, value=0.7, step=0.1, format="%.1f", key="bridge_rate")
 
 # 수수료 계산
-consult_fee = int(consult_amount * consult_rate / 100)
-bridge_fee = int(bridge_amount * bridge_rate / 100)
-total_fee = consult_fee + bridge_fee
+consult_fee, bridge_fee, total_fee = calculate_fees(consult_amount, consult_rate, bridge_amount, bridge_rate)
 
 # 출력
 st.markdown(f"""
@@ -592,3 +609,41 @@ if cur_name and cur_addr:
         st.success("✅ 현재 입력 정보를 저장했습니다.")
 else:
     st.warning("⚠️ 고객명과 주소를 모두 입력해야 저장할 수 있습니다.")
+
+# ------------------------------
+# 🔹 전체 고객 보고서 일괄 내보내기
+# ------------------------------
+st.markdown("---")
+st.markdown("### 📦 전체 고객 보고서")
+
+if st.button("📦 전체 고객 보고서 만들기 (TXT/XLSX/PDF)", key="bulk_report_button"):
+    from report_export import export_reports_zip
+    # 이전에 만든 zip 정리
+    previous_zip_path = st.session_state.pop("bulk_report_path", None)
+    if previous_zip_path and os.path.exists(previous_zip_path):
+        os.remove(previous_zip_path)
+    progress = st.progress(0.0, text="보고서 생성 중...")
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".zip") as tmp_zip:
+        count = export_reports_zip(
+            tmp_zip,
+            progress=lambda done, total: progress.progress(done / total, text=f"보고서 생성 중... {done}/{total}"),
+        )
+    progress.empty()
+    st.session_state["bulk_report_path"] = tmp_zip.name
+    st.success(f"✅ {count}명의 보고서를 만들었습니다.")
+
+if st.session_state.get("bulk_report_path") and os.path.exists(st.session_state["bulk_report_path"]):
+    with open(st.session_state["bulk_report_path"], "rb") as f:
+        st.download_button(
+            label="📥 보고서 zip 다운로드",
+            data=f,
+            file_name=f"ltv_reports_{datetime.now().strftime('%Y%m%d')}.zip",
+            mime="application/zip"
+        )
+
+# 🔬 프로파일 저장 (업로드 문서 해시 + 고객명으로 태그)
+finish_rerun_profiler(
+    rerun_profiler,
+    upload_hash=st.session_state.get("uploaded_pdf_hash"),
+    customer=st.session_state.get("customer_name", "").strip(),
+)
@@ -0,0 +1,86 @@
+"""
+을구 근저당권 추출 정확도/속도 벤치마크 (합성 등기부 사용)
+
+사용법:
+    python bench_registry_extract.py --docs 200
+"""
+import time
+import random
+import argparse
+
+import fitz  # PyMuPDF
+
+from pdf_utils import extract_mortgages, process_pdf_bytes
+from synthetic_registry import random_registry, make_registry_pdf, active_loans
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run(docs, tables, seed):
+    rng = random.Random(seed)
+    exact = 0
+    expected_total = found_total = matched_total = 0
+    extract_times, total_times = [], []
+
+    for n in range(docs):
+        registry = random_registry(
+            seed=seed * 100000 + n,
+            loans=rng.randint(0, 5),
+            owners=rng.randint(1, 3),
+            cancelled=rng.randint(0, 3),
+        )
+        pdf = make_registry_pdf(registry, filler_pages=rng.randint(1, 4), tables=tables)
+
+        # 업로드 시 전체 처리 시간
+        start = time.perf_counter()
+        process_pdf_bytes(pdf)
+        total_times.append(time.perf_counter() - start)
+
+        # 근저당권 추출만의 시간
+        doc = fitz.open(stream=pdf, filetype="pdf")
+        page_texts = [page.get_text("text") for page in doc]
+        start = time.perf_counter()
+        found = extract_mortgages(doc, page_texts)
+        extract_times.append(time.perf_counter() - start)
+        doc.close()
+
+        expected = [(loan["설정자"], loan["채권최고액"]) for loan in active_loans(registry)]
+        got = [(m["설정자"], m["채권최고액"]) for m in found]
+        exact += expected == got
+        expected_total += len(expected)
+        found_total += len(got)
+        matched_total += sum(1 for e, g in zip(expected, got) if e == g)
+
+    return {
+        "layout": "괘선 표" if tables else "텍스트",
+        "docs": docs,
+        "exact": exact / docs,
+        "precision": matched_total / found_total if found_total else 1.0,
+        "recall": matched_total / expected_total if expected_total else 1.0,
+        "extract_p50": percentile(extract_times, 50) * 1000,
+        "extract_p95": percentile(extract_times, 95) * 1000,
+        "total_p50": percentile(total_times, 50) * 1000,
+        "total_p95": percentile(total_times, 95) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="을구 근저당권 추출 벤치마크")
+    parser.add_argument("--docs", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'레이아웃':<8} {'문서':>5} {'완전일치':>8} {'정밀도':>7} {'재현율':>7} {'추출 p50(ms)':>12} {'추출 p95(ms)':>12} {'전체 p50(ms)':>12} {'전체 p95(ms)':>12}")
+    for tables in (True, False):
+        r = run(args.docs, tables, args.seed)
+        print(
+            f"{r['layout']:<8} {r['docs']:>5} {r['exact']:>8.1%} {r['precision']:>7.1%} {r['recall']:>7.1%} "
+            f"{r['extract_p50']:>12.1f} {r['extract_p95']:>12.1f} {r['total_p50']:>12.1f} {r['total_p95']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+앱 결과 텍스트 ↔ 일괄 보고서 일치 검사
+
+AppTest 로 app.py 를 헤드리스 실행해 무작위 입력(지역/방공제/시세/LTV/대출 항목/수수료)을
+넣고 저장한 뒤, 화면의 결과 텍스트·수수료와 저장된 이력으로 만든 보고서
+(report_export.build_customer_report)가 같은지 확인한다. 불일치가 있으면 종료 코드 1.
+
+사용법:
+    python check_report_parity.py --cases 20
+"""
+import os
+import re
+import sys
+import random
+import shutil
+import argparse
+import tempfile
+
+from streamlit.testing.v1 import AppTest
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(REPO_DIR, "app.py")
+sys.path.insert(0, REPO_DIR)
+
+from ltv_map import region_options
+from ltv_report import build_fee_text
+from report_export import latest_records, build_customer_report
+
+LENDERS = ["국민은행", "신한은행", "하나은행", "우리은행", "새마을금고", "농협"]
+
+
+def random_case(rng, n):
+    return {
+        "name": f"검사고객{n}",
+        "address": f"서울특별시 테스트구 검사로 {n} 제{rng.randint(1, 20)}층 제{rng.randint(101, 1504)}호",
+        "region": rng.choice(region_options),
+        "manual_d": rng.choice([None, None, f"{rng.randint(0, 60) * 100:,}", ""]),
+        "kb_price": rng.choice([f"{rng.randint(20, 200) * 1000}", f"{rng.randint(2, 20)}억"]),
+        "area": f"{rng.randint(40, 130)}.{rng.randint(10, 99)}",
+        "ltv1": rng.choice(["70", "75", "80", ""]),
+        "ltv2": rng.choice(["", "", "60", "85"]),
+        "loans": [
+            {
+                "lender": rng.choice(LENDERS),
+                "maxamt": f"{rng.randint(10, 500) * 100:,}",
+                "principal": rng.choice([None, f"{rng.randint(5, 400) * 100:,}"]),
+                "status": rng.choice(["유지", "대환", "선말소"]),
+            }
+            for _ in range(rng.randint(0, 3))
+        ],
+        "consult_amt": rng.choice(["", f"{rng.randint(1, 50) * 100:,}"]),
+        "consult_rate": rng.choice([1.5, 2.0]),
+        "bridge_amt": rng.choice(["", f"{rng.randint(1, 50) * 100:,}"]),
+        "bridge_rate": rng.choice([0.7, 1.0]),
+    }
+
+
+def fill_app(at, case):
+    at.text_input(key="customer_name").set_value(case["name"])
+    at.text_input(key="address_input").set_value(case["address"])
+    at.selectbox(key="region").set_value(case["region"])
+    at.run()
+    if case["manual_d"] is not None:
+        at.text_input(key="manual_d").set_value(case["manual_d"])
+    at.text_input(key="raw_price_input").set_value(case["kb_price"])
+    at.text_input(key="area_input").set_value(case["area"])
+    at.text_input(key="ltv1").set_value(case["ltv1"])
+    at.text_input(key="ltv2").set_value(case["ltv2"])
+    at.number_input(key="rows").set_value(len(case["loans"]))
+    at.run()
+
+    for i, loan in enumerate(case["loans"]):
+        at.text_input(key=f"lender_{i}").set_value(loan["lender"])
+        at.text_input(key=f"maxamt_{i}").set_value(loan["maxamt"])
+        at.selectbox(key=f"status_{i}").set_value(loan["status"])
+        at.run()
+        if loan["principal"] is not None:
+            at.text_input(key=f"principal_{i}").set_value(loan["principal"])
+            at.run()
+
+    at.text_input(key="consult_amt").set_value(case["consult_amt"])
+    at.number_input(key="consult_rate").set_value(case["consult_rate"])
+    at.text_input(key="bridge_amt").set_value(case["bridge_amt"])
+    at.number_input(key="bridge_rate").set_value(case["bridge_rate"])
+    at.run()
+
+
+def app_output(at):
+    text = at.text_area[0].value
+    fee_md = next(m.value for m in at.markdown if "수수료 합계" in m.value)
+    total_fee, consult_fee, bridge_fee = (int(v.replace(",", "")) for v in re.findall(r"([\d,]+)만원", fee_md))
+    return text + "\n" + build_fee_text(consult_fee, bridge_fee, total_fee)
+
+
+def check(cases, seed):
+    rng = random.Random(seed)
+    mismatches = 0
+    for n in range(cases):
+        case = random_case(rng, n)
+        at = AppTest.from_file(APP_PATH, default_timeout=60)
+        at.run()
+        fill_app(at, case)
+        expected = app_output(at)
+        at.button(key="manual_save_button").click()
+        at.run()
+        if at.exception:
+            raise RuntimeError(f"앱 실행 오류: {at.exception[0].message}")
+
+        record = next(r for r in latest_records() if r["고객명"] == case["name"])
+        actual = build_customer_report(record)["text"]
+        if actual != expected:
+            mismatches += 1
+            print(f"❌ {case['name']} 불일치 (지역={case['region']!r}, 방공제={case['manual_d']!r})")
+            print("  앱    :", expected.replace("\n", " / "))
+            print("  보고서:", actual.replace("\n", " / "))
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="앱 결과 텍스트와 일괄 보고서 일치 검사")
+    parser.add_argument("--cases", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    # 저장 파일이 저장소를 건드리지 않도록 격리된 작업 폴더에서 실행
+    workdir = tempfile.mkdtemp(prefix="ltv_parity_")
+    os.chdir(workdir)
+    try:
+        mismatches = check(args.cases, args.seed)
+    finally:
+        os.chdir(REPO_DIR)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{'✅' if not mismatches else '❌'} {args.cases}건 중 불일치 {mismatches}건")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,58 @@
 import pandas as pd
 import os
+import io
+import csv
+import gzip
+import json
+import threading
 from datetime import datetime
 import streamlit as st
 from ast import literal_eval
 
+from shared_cache import shared_cache, history_key, bump_history_version
+
 HISTORY_FILE = "ltv_input_history.csv"
-ARCHIVE_FILE = "ltv_archive_deleted.xlsx"
+ARCHIVE_DIR = "ltv_archive"
+ARCHIVE_SEGMENT_MAX_BYTES = 5 * 1024 * 1024  # 세그먼트 회전 기준 (압축 후 크기)
+
+# 여러 세션이 동시에 저장/삭제해도 읽기-수정-쓰기가 섞이지 않도록
+_history_write_lock = threading.Lock()
+
+
+def _write_history(df):
+    # 임시 파일에 쓴 뒤 교체 → 다른 세션이 쓰는 도중의 빈/반쪽 파일을 읽지 않음
+    tmp_path = f"{HISTORY_FILE}.{os.getpid()}.{threading.get_ident()}.tmp"
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, HISTORY_FILE)
+    bump_history_version()
 
 
 def get_customer_name():
     return st.session_state.get("customer_name", "").strip()
 
 
-def get_customer_options():
+def load_history_df():
+    """이력 CSV 스냅샷. 모든 세션이 공유하므로 읽기 전용으로 사용 (저장/삭제 시 자동 무효화)."""
     if not os.path.exists(HISTORY_FILE):
-        return []
-    df = pd.read_csv(HISTORY_FILE)
-    if df.empty:
-        return []
-    return df["고객명"].dropna().unique().tolist()
+        return None
+    return shared_cache.get_or_load(history_key(HISTORY_FILE), lambda: pd.read_csv(HISTORY_FILE))
+
+
+def get_customer_options():
+    def load():
+        df = load_history_df()
+        if df is None or df.empty:
+            return []
+        return df["고객명"].dropna().unique().tolist()
+
+    return shared_cache.get_or_load(history_key(HISTORY_FILE, "customers"), load)
 
 
 def load_customer_input(customer_name):
-    if not os.path.exists(HISTORY_FILE):
+    df = load_history_df()
+    if df is None:
         return
 
-    df = pd.read_csv(HISTORY_FILE)
-
     row = df[df["고객명"] == customer_name].tail(1)
     if row.empty:
         return
@@ -55,6 +81,12 @@ def save_user_input(overwrite=False):
         "KB시세": st.session_state.get("raw_price_input", ""),
         "면적": st.session_state.get("area_input", ""),
         "공동소유자": st.session_state.get("co_owners", []),
+        "LTV1": st.session_state.get("ltv1", ""),
+        "LTV2": st.session_state.get("ltv2", ""),
+        "컨설팅금액": st.session_state.get("consult_amt", ""),
+        "컨설팅수수료율": st.session_state.get("consult_rate", ""),
+        "브릿지금액": st.session_state.get("bridge_amt", ""),
+        "브릿지수수료율": st.session_state.get("bridge_rate", ""),
         "대출항목": [],
         "저장시각": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
     }
@@ -72,36 +104,107 @@ def save_user_input(overwrite=False):
 
     df_new = pd.DataFrame([data])
 
-    if os.path.exists(HISTORY_FILE):
-        df_old = pd.read_csv(HISTORY_FILE)
-        if overwrite:
-            df_old = df_old[df_old["고객명"] != customer_name]
-        df_final = pd.concat([df_old, df_new], ignore_index=True)
-    else:
-        df_final = df_new
+    with _history_write_lock:
+        df_old = load_history_df()
+        if df_old is not None:
+            if overwrite:
+                df_old = df_old[df_old["고객명"] != customer_name]
+            df_final = pd.concat([df_old, df_new], ignore_index=True)
+        else:
+            df_final = df_new
 
-    df_final.to_csv(HISTORY_FILE, index=False)
+        _write_history(df_final)
 
 
 def cleanup_old_history(name_to_delete):
-    if not os.path.exists(HISTORY_FILE):
-        return
-
-    df = pd.read_csv(HISTORY_FILE)
+    with _history_write_lock:
+        df = load_history_df()
+        if df is None:
+            return
 
-    to_delete = df[df["고객명"] == name_to_delete]
-    df = df[df["고객명"] != name_to_delete]
+        to_delete = df[df["고객명"] == name_to_delete]
+        df = df[df["고객명"] != name_to_delete]
 
-    if not to_delete.empty:
-        to_delete.to_excel(ARCHIVE_FILE, index=False)
-        st.session_state["deleted_data_ready"] = True
+        if not to_delete.empty:
+            append_to_archive(to_delete.to_dict("records"))
+            st.session_state["deleted_data_ready"] = True
 
-    df.to_csv(HISTORY_FILE, index=False)
+        _write_history(df)
 
 
 def search_customers_by_keyword(keyword):
-    if not os.path.exists(HISTORY_FILE):
+    df = load_history_df()
+    if df is None:
         return []
-    df = pd.read_csv(HISTORY_FILE)
     results = df[df["고객명"].str.contains(keyword, na=False)]
     return results["고객명"].unique().tolist()
+
+
+# ------------------------------
+# 🗃️ 삭제 이력 아카이브 (gzip JSONL 세그먼트, 추가 전용)
+# ------------------------------
+
+def _archive_segments():
+    if not os.path.isdir(ARCHIVE_DIR):
+        return []
+    names = sorted(n for n in os.listdir(ARCHIVE_DIR) if n.endswith(".jsonl.gz"))
+    return [os.path.join(ARCHIVE_DIR, n) for n in names]
+
+
+def _current_segment():
+    segments = _archive_segments()
+    if segments and os.path.getsize(segments[-1]) < ARCHIVE_SEGMENT_MAX_BYTES:
+        return segments[-1]
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    return os.path.join(ARCHIVE_DIR, f"deleted-{stamp}.jsonl.gz")
+
+
+def append_to_archive(records):
+    deleted_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    lines = []
+    for record in records:
+        # CSV 에서 읽은 빈 칸(NaN)은 JSON null 로 기록
+        record = {k: (None if isinstance(v, float) and pd.isna(v) else v) for k, v in record.items()}
+        record["삭제시각"] = deleted_at
+        lines.append(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    # gzip 멤버를 이어붙이는 방식이라 기존 내용은 다시 쓰지 않음
+    with gzip.open(_current_segment(), "at", encoding="utf-8") as f:
+        f.writelines(lines)
+
+
+def iter_archive(start=None, end=None):
+    """삭제 이력을 세그먼트 순서대로 한 건씩 읽는다. start/end 는 date (포함)."""
+    start_str = start.strftime("%Y-%m-%d") if start else None
+    end_str = end.strftime("%Y-%m-%d") if end else None
+    for path in _archive_segments():
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                day = str(record.get("삭제시각", ""))[:10]
+                if start_str and day < start_str:
+                    continue
+                if end_str and day > end_str:
+                    continue
+                yield record
+
+
+def export_archive_csv(start=None, end=None):
+    """기간 내 삭제 이력을 CSV bytes 로 반환한다.
+    세그먼트는 한 건씩 읽지만 결과 CSV 는 다운로드 버튼에 넘기기 위해 메모리에 모두 만든다
+    (선택한 기간의 CSV 크기만큼 메모리 사용 — 기간을 나눠 내보내면 줄어듦)."""
+    # 저장 항목이 늘어난 이전/이후 기록이 섞여 있으므로 1차로 전체 컬럼을 모은 뒤 2차로 기록
+    fieldnames = {}
+    for record in iter_archive(start, end):
+        fieldnames.update(dict.fromkeys(record))
+    if not fieldnames:
+        return b""
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(fieldnames))
+    writer.writeheader()
+    writer.writerows(iter_archive(start, end))
+    return buffer.getvalue().encode("utf-8-sig")
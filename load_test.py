@@ -0,0 +1,306 @@
+"""
+LTV 계산기 동시 세션 부하 테스트
+
+Streamlit AppTest 로 app.py 를 헤드리스 실행해 N개의 직원 세션을 흉내낸다.
+각 세션은 합성 등기부 PDF 업로드 → 미리보기 페이지 넘김 → 대출 항목 입력 → 저장
+→ Notion 동기화(가짜 클라이언트) 순서로 진행한다. 네트워크 없이 동작.
+
+AppTest 는 실행할 때마다 전역 Runtime 을 교체하므로 한 프로세스에서 여러 세션을
+동시에 돌릴 수 없다. 그래서 세션마다 별도 프로세스를 띄워 예열한 뒤 동시에 출발시킨다.
+- 같은 작업 폴더를 쓰므로 이력 CSV/미러 DB/임시 파일 경합은 그대로 드러난다
+  (실패한 세션은 중단하지 않고 '실패' 열에 집계)
+- 세션마다 GIL 과 프로세스 내 공유 캐시가 따로라, 단일 서버 프로세스의 CPU 경합과
+  캐시 공유 효과는 이 수치에 포함되지 않는다
+- 메모리/세션은 예열 전(하네스 import 직후) RSS 대비 세션 종료 시점 RSS 증가분의 평균,
+  총메모리는 그 수준의 모든 세션 프로세스 RSS 합계
+
+사용법:
+    python load_test.py --sessions 1 5 10 20 --pages 3
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import multiprocessing
+from queue import Empty
+from datetime import datetime, timedelta
+
+from streamlit.testing.v1 import AppTest
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(REPO_DIR, "app.py")
+sys.path.insert(0, REPO_DIR)
+
+import notion_utils
+from synthetic_registry import random_registry, make_registry_pdf
+
+BARRIER_TIMEOUT = 600  # 예열 후 모든 세션이 출발선에 모일 때까지 기다리는 최대 시간(초)
+
+
+# ------------------------------
+# 🔹 가짜 Notion 클라이언트
+# ------------------------------
+
+class FakeNotionDatabases:
+    def __init__(self, pages):
+        self._pages = pages
+
+    def query(self, database_id, filter=None, sorts=None, page_size=100, start_cursor=None):
+        pages = sorted(self._pages, key=lambda p: p["last_edited_time"])
+        if filter:
+            cursor = filter["last_edited_time"]["on_or_after"]
+            pages = [p for p in pages if p["last_edited_time"] >= cursor]
+        start = int(start_cursor or 0)
+        chunk = pages[start:start + page_size]
+        has_more = start + page_size < len(pages)
+        return {"results": chunk, "has_more": has_more, "next_cursor": str(start + page_size) if has_more else None}
+
+
+class FakeNotionPages:
+    def __init__(self, pages):
+        self._pages = pages
+        self._lock = threading.Lock()
+
+    def create(self, parent, properties):
+        with self._lock:
+            page = {
+                "id": f"fake-{len(self._pages)}",
+                "last_edited_time": datetime.now().isoformat(),
+                "properties": properties,
+            }
+            self._pages.append(page)
+            return page
+
+    def update(self, page_id, archived=False):
+        with self._lock:
+            self._pages[:] = [p for p in self._pages if p["id"] != page_id]
+
+
+class FakeNotionClient:
+    def __init__(self, records=200):
+        base = datetime.now() - timedelta(days=60)
+        self._pages = [
+            {
+                "id": f"seed-{i}",
+                "last_edited_time": (base + timedelta(minutes=i)).isoformat(),
+                "properties": {
+                    "고객명": {"title": [{"plain_text": f"고객{i}"}]},
+                    "주소": {"rich_text": [{"plain_text": f"서울특별시 테스트구 {i}"}]},
+                    "저장시간": {"date": {"start": (base + timedelta(minutes=i)).isoformat()}},
+                },
+            }
+            for i in range(records)
+        ]
+        self.databases = FakeNotionDatabases(self._pages)
+        self.pages = FakeNotionPages(self._pages)
+
+
+# ------------------------------
+# 🔹 측정 유틸
+# ------------------------------
+
+def rss_bytes():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+# ------------------------------
+# 🔹 세션 시나리오
+# ------------------------------
+
+def click(at, label=None, key=None):
+    if key:
+        at.button(key=key).click()
+    else:
+        next(b for b in at.button if b.label == label).click()
+
+
+def run_session(session_id, pages, timeout):
+    latencies = []
+
+    def timed_run(at):
+        start = time.perf_counter()
+        at.run(timeout=timeout)
+        latencies.append(time.perf_counter() - start)
+        if at.exception:
+            raise RuntimeError(f"세션 {session_id} 실행 오류: {at.exception[0].message}")
+
+    registry = random_registry(seed=session_id, loans=3)
+    pdf = make_registry_pdf(registry, filler_pages=pages * 2)
+
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    timed_run(at)
+
+    # 1. PDF 업로드
+    at.file_uploader[0].set_value((f"registry_{session_id}.pdf", pdf, "application/pdf"))
+    timed_run(at)
+
+    # 2. 미리보기 페이지 넘김
+    for _ in range(pages):
+        click(at, label="➡️ 다음 페이지")
+        timed_run(at)
+
+    # 3. 대출 항목 입력
+    for i, loan in enumerate(registry["loans"]):
+        at.text_input(key=f"lender_{i}").set_value(loan["설정자"])
+        at.text_input(key=f"maxamt_{i}").set_value(f"{loan['채권최고액']:,}")
+        at.selectbox(key=f"status_{i}").set_value("대환" if i == 0 else "유지")
+        timed_run(at)
+
+    # 4. 저장
+    at.text_input(key="customer_name").set_value(f"부하테스트{session_id}")
+    at.text_input(key="address_input").set_value(registry["address"])
+    timed_run(at)
+    click(at, key="manual_save_button")
+    timed_run(at)
+
+    # 5. Notion 동기화 (가짜 클라이언트)
+    click(at, key="notion_sync_button")
+    timed_run(at)
+
+    return at, latencies
+
+
+def setup_worker(workdir, notion_records):
+    # 저장 파일/임시 PDF/미러 DB 가 저장소를 건드리지 않도록 격리된 작업 폴더에서 실행
+    os.chdir(workdir)
+    tempfile.tempdir = os.path.join(workdir, "tmp")
+    fake_client = FakeNotionClient(records=notion_records)
+    notion_utils.get_notion_client = lambda: (fake_client, "fake-db")
+
+
+def session_process(session_id, pages, timeout, workdir, notion_records, barrier, results):
+    setup_worker(workdir, notion_records)
+    # 앱 모듈 import/캐시/세션 상태가 모두 잡히도록 예열 전에 기준 RSS 측정
+    rss_base = rss_bytes()
+    try:
+        # 모듈 import/폰트 로딩 등 1회성 비용이 측정에 섞이지 않도록 예열
+        run_session(-1 - session_id, pages, timeout)
+    finally:
+        # 다른 세션이 예열 중 죽어도 무한 대기하지 않도록
+        barrier.wait(timeout=BARRIER_TIMEOUT)
+
+    started = time.time()
+    try:
+        at, latencies = run_session(session_id, pages, timeout)
+        error = None
+    except Exception as e:
+        latencies, error = [], f"{type(e).__name__}: {e}"
+    results.put({
+        "latencies": latencies,
+        "error": error,
+        "rss": rss_bytes(),  # AppTest 객체(at)가 살아 있는 상태에서 측정
+        "rss_base": rss_base,
+        "started": started,
+        "finished": time.time(),
+    })
+
+
+def run_level(sessions, pages, timeout, workdir, notion_records):
+    disk_before = dir_size(workdir)
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(sessions)
+    results = ctx.Queue()
+    procs = [
+        ctx.Process(target=session_process, args=(sid, pages, timeout, workdir, notion_records, barrier, results))
+        for sid in range(sessions)
+    ]
+    for proc in procs:
+        proc.start()
+
+    # 각 세션의 결과를 모으되, 비정상 종료한 프로세스는 실패로 집계
+    collected = []
+    while len(collected) < sessions:
+        try:
+            collected.append(results.get(timeout=1))
+        except Empty:
+            if not any(proc.is_alive() for proc in procs):
+                break
+    for proc in procs:
+        proc.join()
+    disk_after = dir_size(workdir)
+
+    latencies = [lat for r in collected for lat in r["latencies"]]
+    errors = [r["error"] for r in collected if r["error"]]
+    errors += ["프로세스 비정상 종료"] * (sessions - len(collected))
+    for error in dict.fromkeys(errors):
+        print(f"❌ 세션 실패: {error}")
+
+    return {
+        "sessions": sessions,
+        "failed": len(errors),
+        "reruns": len(latencies),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mem_per_session_mb": sum(r["rss"] - r["rss_base"] for r in collected) / max(len(collected), 1) / 2**20,
+        "mem_total_mb": sum(r["rss"] for r in collected) / 2**20,
+        "temp_disk_mb": (disk_after - disk_before) / 2**20,
+        "wall_s": (max(r["finished"] for r in collected) - min(r["started"] for r in collected)) if collected else 0.0,
+    }
+
+
+def print_report(rows):
+    header = f"{'세션':>6} {'실패':>4} {'rerun':>6} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9} {'메모리/세션(MB)':>15} {'총메모리(MB)':>12} {'임시디스크(MB)':>14} {'총시간(s)':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        print(
+            f"{r['sessions']:>6} {r['failed']:>4} {r['reruns']:>6} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f} "
+            f"{r['mem_per_session_mb']:>15.1f} {r['mem_total_mb']:>12.1f} {r['temp_disk_mb']:>14.2f} {r['wall_s']:>9.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LTV 계산기 동시 세션 부하 테스트")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--pages", type=int, default=3, help="세션당 미리보기 페이지 넘김 횟수")
+    parser.add_argument("--timeout", type=float, default=60.0, help="rerun 1회 제한 시간(초)")
+    parser.add_argument("--notion-records", type=int, default=200, help="가짜 Notion DB 레코드 수")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="ltv_load_")
+    os.makedirs(os.path.join(workdir, "tmp"))
+
+    try:
+        rows = []
+        for sessions in args.sessions:
+            rows.append(run_level(sessions, args.pages, args.timeout, workdir, args.notion_records))
+            print(f"✅ 동시 세션 {sessions}개 완료")
+        print()
+        print_report(rows)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -20,3 +20,6 @@ region_map = {
     "그밖의 지역": 2500,
     "방공제없음": 0,
 }
+
+# 선택 상자용 목록 (모듈은 프로세스당 한 번만 로드되므로 모든 세션이 공유)
+region_options = ("",) + tuple(region_map.keys())
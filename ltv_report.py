@@ -0,0 +1,131 @@
+import re
+
+# LTV 한도/수수료 계산과 결과 텍스트 작성 (앱 화면과 일괄 보고서 내보내기에서 공용)
+
+
+def to_number(text):
+    digits = re.sub(r"[^\d]", "", str(text or ""))
+    return int(digits) if digits else 0
+
+def parse_korean_number(text: str) -> int:
+    txt = text.replace(",", "").strip()
+    total = 0
+    m = re.search(r"(\d+)\s*억", txt)
+    if m:
+        total += int(m.group(1)) * 10000
+    m = re.search(r"(\d+)\s*천만", txt)
+    if m:
+        total += int(m.group(1)) * 1000
+    m = re.search(r"(\d+)\s*만", txt)
+    if m:
+        total += int(m.group(1))
+    if total == 0:
+        try:
+            total = int(txt)
+        except:
+            total = 0
+    return total
+
+def select_ltv_ratios(values):
+    ltv_selected = []
+    for val in values:
+        try:
+            v = int(val)
+            if 1 <= v <= 100:
+                ltv_selected.append(v)
+        except:
+            continue
+    return list(dict.fromkeys(ltv_selected))  # 중복 제거
+
+def calculate_ltv(total_value, deduction, principal_sum, maintain_maxamt_sum, ltv, is_senior=True):
+    if is_senior:
+        limit = int(total_value * (ltv / 100) - deduction)
+        available = int(limit - principal_sum)
+    else:
+        limit = int(total_value * (ltv / 100) - maintain_maxamt_sum - deduction)
+        available = int(limit - principal_sum)
+    limit = (limit // 10) * 10
+    available = (available // 10) * 10
+    return limit, available
+
+# ------------------------------
+# 🔹 대출 항목 합계 및 한도
+# ------------------------------
+
+def loan_sums(items):
+    # 진행구분별 합계 계산
+    sum_dh = sum(to_number(item.get("원금")) for item in items if item.get("진행구분") == "대환")
+    sum_sm = sum(to_number(item.get("원금")) for item in items if item.get("진행구분") == "선말소")
+    sum_maintain = sum(to_number(item.get("채권최고액")) for item in items if item.get("진행구분") == "유지")
+    sum_sub_principal = sum(to_number(item.get("원금")) for item in items if item.get("진행구분") not in ["유지"])
+    return sum_dh, sum_sm, sum_maintain, sum_sub_principal
+
+def valid_loan_items(items):
+    # 유효 항목만 필터링
+    return [item for item in items if any([
+        item.get("설정자", "").strip(),
+        re.sub(r"[^\d]", "", item.get("채권최고액", "") or "0") != "0",
+        re.sub(r"[^\d]", "", item.get("원금", "") or "0") != "0"
+    ])]
+
+def calculate_limits(total_value, deduction, items, ltv_selected):
+    """(선순위 한도, 후순위 한도, 진행구분별 합계) — 한도는 {ltv: (한도, 가용)}"""
+    limit_senior_dict = {}
+    limit_sub_dict = {}
+    sum_dh, sum_sm, sum_maintain, sum_sub_principal = loan_sums(items)
+
+    for ltv in ltv_selected:
+        if sum_maintain > 0:
+            limit_sub_dict[ltv] = calculate_ltv(total_value, deduction, sum_sub_principal, sum_maintain, ltv, is_senior=False)
+        else:
+            limit_senior_dict[ltv] = calculate_ltv(total_value, deduction, sum_dh + sum_sm, 0, ltv, is_senior=True)
+
+    return limit_senior_dict, limit_sub_dict, (sum_dh, sum_sm, sum_maintain, sum_sub_principal)
+
+# ------------------------------
+# 🔹 결과 텍스트
+# ------------------------------
+
+def build_result_text(customer_name, address, floor_num, kb_price, area, deduction,
+                      valid_items, ltv_selected, limit_senior_dict, limit_sub_dict, sum_dh, sum_sm):
+    text_to_copy = f"고객명 : {customer_name}\n주소 : {address}\n"
+    type_of_price = "하안가" if floor_num and floor_num <= 2 else "일반가"
+    text_to_copy += f"{type_of_price} | KB시세: {kb_price} | 전용면적 : {area} | 방공제 금액 : {deduction:,}만\n"
+
+    if valid_items:
+        text_to_copy += "\n대출 항목\n"
+        for item in valid_items:
+            max_amt = to_number(item.get("채권최고액", "0"))
+            principal_amt = to_number(item.get("원금", "0"))
+            text_to_copy += f"{item.get('설정자', '')} | 채권최고액: {max_amt:,} | 비율: {item.get('설정비율', '0')}% | 원금: {principal_amt:,} | {item.get('진행구분', '')}\n"
+
+    for ltv in ltv_selected:
+        if ltv in limit_senior_dict:
+            limit, avail = limit_senior_dict[ltv]
+            text_to_copy += f"\n선순위 LTV {ltv}% {limit:,} 가용 {avail:,}"
+        if ltv in limit_sub_dict:
+            limit, avail = limit_sub_dict[ltv]
+            text_to_copy += f"\n후순위 LTV {ltv}% {limit:,} 가용 {avail:,}"
+
+    text_to_copy += "\n진행구분별 원금 합계\n"
+    if sum_dh > 0:
+        text_to_copy += f"대환: {sum_dh:,}만\n"
+    if sum_sm > 0:
+        text_to_copy += f"선말소: {sum_sm:,}만\n"
+    return text_to_copy
+
+# ------------------------------
+# 🔹 수수료
+# ------------------------------
+
+def calculate_fees(consult_amount, consult_rate, bridge_amount, bridge_rate):
+    consult_fee = int(consult_amount * consult_rate / 100)
+    bridge_fee = int(bridge_amount * bridge_rate / 100)
+    return consult_fee, bridge_fee, consult_fee + bridge_fee
+
+def build_fee_text(consult_fee, bridge_fee, total_fee):
+    return (
+        f"수수료 합계: {total_fee:,}만원\n"
+        f"- 컨설팅 수수료: {consult_fee:,}만원\n"
+        f"- 브릿지 수수료: {bridge_fee:,}만원\n"
+    )
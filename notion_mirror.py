@@ -0,0 +1,206 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from contextlib import closing
+
+from shared_cache import shared_cache, file_key
+
+MIRROR_FILE = "notion_mirror.db"
+LIST_LIMIT = 50  # 사이드바에 보여줄 최대 건수
+
+# Notion 속성명 → 로컬 컬럼명
+PROPERTY_COLUMNS = {
+    "고객명": "name",
+    "주소": "address",
+    "지역": "region",
+    "메모": "memo",
+    "대출항목": "loans",
+    "KB시세": "kb_price",
+    "면적": "area",
+    "공동소유자": "co_owners",
+    "저장시간": "saved_at",
+}
+
+
+_schema_ready = set()  # 이 프로세스에서 스키마를 만든 DB 경로
+_schema_lock = threading.Lock()
+
+
+# 🗄️ 미러 DB 연결 (스키마는 프로세스당 한 번만 생성)
+def connect_mirror(path=MIRROR_FILE):
+    fresh = not os.path.exists(path)
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    with _schema_lock:
+        if fresh or path not in _schema_ready:
+            _create_schema(conn)
+            _schema_ready.add(path)
+    return conn
+
+
+def _create_schema(conn):
+    columns = ", ".join(f"{col} TEXT" for col in PROPERTY_COLUMNS.values())
+    conn.executescript(
+        f"""
+        CREATE TABLE IF NOT EXISTS pages (
+            id TEXT PRIMARY KEY,
+            {columns},
+            last_edited_time TEXT,
+            archived INTEGER DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_pages_saved_at ON pages (saved_at);
+        CREATE TABLE IF NOT EXISTS sync_state (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+        """
+    )
+
+
+def _plain_text(prop):
+    if not prop:
+        return ""
+    if "date" in prop:
+        return (prop.get("date") or {}).get("start") or ""
+    parts = prop.get("title") or prop.get("rich_text") or []
+    return "".join(p.get("plain_text") or p.get("text", {}).get("content", "") for p in parts)
+
+
+def page_to_row(page):
+    props = page.get("properties", {})
+    row = {col: _plain_text(props.get(prop)) for prop, col in PROPERTY_COLUMNS.items()}
+    row["id"] = page["id"]
+    row["last_edited_time"] = page.get("last_edited_time", "")
+    row["archived"] = int(bool(page.get("archived") or page.get("in_trash")))
+    return row
+
+
+def upsert_pages(conn, pages):
+    rows = [page_to_row(p) for p in pages]
+    if not rows:
+        return 0
+    columns = list(rows[0].keys())
+    placeholders = ", ".join(f":{c}" for c in columns)
+    updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c != "id")
+    conn.executemany(
+        f"INSERT INTO pages ({', '.join(columns)}) VALUES ({placeholders}) "
+        f"ON CONFLICT(id) DO UPDATE SET {updates}",
+        rows,
+    )
+    conn.commit()
+    return len(rows)
+
+
+def get_sync_state(conn, key, default=None):
+    row = conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+    return row["value"] if row else default
+
+
+def set_sync_state(conn, key, value):
+    conn.execute(
+        "INSERT INTO sync_state (key, value) VALUES (?, ?) "
+        "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+        (key, value),
+    )
+    conn.commit()
+
+
+# 🔄 last_edited_time 커서 기반 증분 동기화
+def sync_mirror(client, database_id, path=MIRROR_FILE):
+    """커서 이후 수정된 페이지만 받아와 반영한다. 반영한 페이지 수를 반환."""
+    with closing(connect_mirror(path)) as conn:
+        cursor = get_sync_state(conn, "last_edited_time")
+        query = {
+            "database_id": database_id,
+            "sorts": [{"timestamp": "last_edited_time", "direction": "ascending"}],
+            "page_size": 100,
+        }
+        if cursor:
+            # Notion 의 last_edited_time 은 분 단위라 경계 페이지는 다시 받을 수 있음 (upsert 로 멱등)
+            query["filter"] = {
+                "timestamp": "last_edited_time",
+                "last_edited_time": {"on_or_after": cursor},
+            }
+
+        synced = 0
+        start_cursor = None
+        while True:
+            if start_cursor:
+                query["start_cursor"] = start_cursor
+            response = client.databases.query(**query)
+            pages = response.get("results", [])
+            synced += upsert_pages(conn, pages)
+            if pages:
+                # 페이지 단위로 커서를 저장해 중간에 끊겨도 이어서 동기화
+                set_sync_state(conn, "last_edited_time", pages[-1]["last_edited_time"])
+            if not response.get("has_more"):
+                break
+            start_cursor = response.get("next_cursor")
+
+        set_sync_state(conn, "last_synced_at", datetime.now().isoformat())
+        return synced
+
+
+def mark_archived(page_id, path=MIRROR_FILE):
+    with closing(connect_mirror(path)) as conn:
+        conn.execute("UPDATE pages SET archived = 1 WHERE id = ?", (page_id,))
+        conn.commit()
+
+
+# 📋 로컬 조회 함수들 (Notion 연결 없이 동작)
+# 화면 조회는 rerun 마다 불리므로 DB 파일 mtime 기준으로 공유 캐시에 보관 (동기화/기록 시 자동 무효화)
+# 반환값은 여러 세션이 공유하므로 읽기 전용으로 사용할 것
+
+def _cached_query(path, sql, params=()):
+    if not os.path.exists(path):
+        return []
+
+    def load():
+        with closing(connect_mirror(path)) as conn:
+            return [dict(r) for r in conn.execute(sql, params).fetchall()]
+
+    return shared_cache.get_or_load(file_key("mirror", path, sql, params), load)
+
+
+def list_mirrored_customers(path=MIRROR_FILE, limit=LIST_LIMIT, offset=0):
+    return _cached_query(
+        path,
+        "SELECT id, name, address, saved_at FROM pages WHERE archived = 0 "
+        "ORDER BY saved_at DESC LIMIT ? OFFSET ?",
+        (limit, offset),
+    )
+
+
+def search_mirrored_customers(keyword, path=MIRROR_FILE, limit=LIST_LIMIT, offset=0):
+    pattern = f"%{keyword}%"
+    return _cached_query(
+        path,
+        "SELECT id, name, address, saved_at FROM pages WHERE archived = 0 "
+        "AND (name LIKE ? OR address LIKE ?) ORDER BY saved_at DESC LIMIT ? OFFSET ?",
+        (pattern, pattern, limit, offset),
+    )
+
+
+def count_mirrored_customers(keyword="", path=MIRROR_FILE):
+    pattern = f"%{keyword}%"
+    rows = _cached_query(
+        path,
+        "SELECT COUNT(*) AS n FROM pages WHERE archived = 0 AND (name LIKE ? OR address LIKE ?)",
+        (pattern, pattern),
+    )
+    return rows[0]["n"] if rows else 0
+
+
+def find_entries_older_than(cutoff, path=MIRROR_FILE):
+    with closing(connect_mirror(path)) as conn:
+        rows = conn.execute(
+            "SELECT * FROM pages WHERE archived = 0 AND saved_at != '' AND saved_at < ?",
+            (cutoff.isoformat(),),
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+
+def get_last_synced_at(path=MIRROR_FILE):
+    rows = _cached_query(path, "SELECT value FROM sync_state WHERE key = 'last_synced_at'")
+    return rows[0]["value"] if rows else None
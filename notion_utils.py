@@ -2,8 +2,17 @@
 from notion_client import Client
 import os
 from datetime import datetime, timedelta
+from contextlib import closing
 import streamlit as st  # st.secrets용
 
+from notion_mirror import (
+    sync_mirror,
+    upsert_pages,
+    connect_mirror,
+    mark_archived,
+    find_entries_older_than,
+)
+
 
 # 🔐 Notion 클라이언트 초기화 함수
 def get_notion_client():
@@ -38,7 +47,7 @@ def delete_customer_from_notion(
     client, database_id = get_notion_client()
 
     try:
-        client.pages.create(
+        page = client.pages.create(
             parent={"database_id": database_id},
             properties={
                 "고객명": {"title": [{"text": {"content": name}}]},
@@ -57,6 +66,10 @@ def delete_customer_from_notion(
     except Exception as e:
         raise RuntimeError(f"❌ Notion 기록 실패: {e}")
 
+    # 방금 만든 페이지는 다음 동기화를 기다리지 않고 로컬 미러에 바로 반영
+    with closing(connect_mirror()) as conn:
+        upsert_pages(conn, [page])
+
 
 # ✅ 수동 저장용 Notion 기록 함수 (timestamp 자동 생성)
 def create_customer_record(
@@ -84,23 +97,37 @@ def create_customer_record(
     )
 
 
+# 🔄 로컬 미러 증분 동기화 (Notion 장애 시 로컬 데이터로 읽기 전용 동작)
+def sync_notion_mirror():
+    try:
+        client, db_id = get_notion_client()
+        synced = sync_mirror(client, db_id)
+        return True, synced
+    except Exception as e:
+        print(f"⚠️ Notion 동기화 실패, 로컬 미러로 동작: {e}")
+        return False, 0
+
+
 # ✅ 오래된 Notion 항목 자동 archive 기능
 def auto_delete_old_entries_from_notion(days=30):
     client, db_id = get_notion_client()
     cutoff = datetime.now() - timedelta(days=days)
 
-    pages = client.databases.query(database_id=db_id).get("results", [])
+    # 전체 조회 대신 변경분만 동기화한 뒤 로컬 미러에서 대상 선별
+    sync_mirror(client, db_id)
+    pages = find_entries_older_than(cutoff)
 
     for page in pages:
-        props = page["properties"]
-        date_field = props.get("저장시간", {}).get("date", {})
-        date_str = date_field.get("start")
+        date_str = page["saved_at"]
 
         if date_str:
             try:
                 page_date = datetime.fromisoformat(date_str)
+                if page_date.tzinfo is not None:
+                    page_date = page_date.astimezone().replace(tzinfo=None)
                 if page_date < cutoff:
                     client.pages.update(page["id"], archived=True)
-                    print(f"✅ 오래된 레코드 아카이브됨: {props['고객명']['title'][0]['text']['content']}")
+                    mark_archived(page["id"])
+                    print(f"✅ 오래된 레코드 아카이브됨: {page['name']}")
             except Exception as e:
                 print(f"⚠️ 날짜 처리 오류: {e}")
@@ -0,0 +1,245 @@
+import os
+import re
+import hashlib
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import fitz  # PyMuPDF
+
+
+# ------------------------------
+# 🔹 텍스트 기반 추출 함수들
+# ------------------------------
+
+def extract_address(text):
+    m = re.search(r"\[집합건물\]\s*([^\n]+)", text)
+    if m:
+        return m.group(1).strip()
+    m = re.search(r"소재지\s*[:：]?\s*([^\n]+)", text)
+    if m:
+        return m.group(1).strip()
+    return ""
+
+def extract_area_floor(text):
+    m = re.findall(r"(\d+\.\d+)\s*㎡", text.replace('\n', ' '))
+    area = f"{m[-1]}㎡" if m else ""
+    floor = None
+    addr = extract_address(text)
+    f_match = re.findall(r"제(\d+)층", addr)
+    if f_match:
+        floor = int(f_match[-1])
+    return area, floor
+
+def extract_all_names_and_births(text):
+    start = text.find("주요 등기사항 요약")
+    if start == -1:
+        return []
+    summary = text[start:]
+    lines = [l.strip() for l in summary.splitlines() if l.strip()]
+    result = []
+    for i in range(len(lines)):
+        if re.match(r"[가-힣]+ \(공유자\)|[가-힣]+ \(소유자\)", lines[i]):
+            name = re.match(r"([가-힣]+)", lines[i]).group(1)
+            if i + 1 < len(lines):
+                birth_match = re.match(r"(\d{6})-", lines[i + 1])
+                if birth_match:
+                    birth = birth_match.group(1)
+                    result.append((name, birth))
+    return result
+
+# ------------------------------
+# 🔹 을구 근저당권 표 추출
+# ------------------------------
+
+EULGU_MARKER = re.compile(r"【\s*을\s*구\s*】")
+
+def _mortgage_amount(detail):
+    # 채권최고액 금120,000,000원 → 12,000 (만원)
+    m = re.search(r"채권최고액\s*금\s*([\d,]+)\s*원", detail)
+    return int(m.group(1).replace(",", "")) // 10000 if m else 0
+
+def _mortgage_lender(detail):
+    m = re.search(r"근저당권자\s*([^\n]+)", detail)
+    if not m:
+        return ""
+    return re.sub(r"\(주\)|주식회사", "", m.group(1).split()[0]).strip()
+
+def parse_mortgage_rows(rows):
+    """(순위번호, 등기목적, 권리자 및 기타사항) 행 목록을 순서대로 읽어
+    말소되지 않은 근저당권만 남긴다. 변경등기는 채권최고액을 갱신."""
+    records = {}
+    for rank, purpose, detail in rows:
+        purpose = re.sub(r"\s", "", purpose or "")
+        detail = detail or ""
+        target = re.match(r"(\d+)번", purpose)
+        if "말소" in purpose and target:
+            records.pop(target.group(1), None)
+        elif "근저당권변경" in purpose and target and target.group(1) in records:
+            amount = _mortgage_amount(detail)
+            if amount:
+                records[target.group(1)]["채권최고액"] = amount
+        elif "근저당권설정" in purpose and rank:
+            rank = re.sub(r"\s", "", rank)
+            records[rank.split("-")[0]] = {
+                "순위번호": rank,
+                "설정자": _mortgage_lender(detail),
+                "채권최고액": _mortgage_amount(detail),
+            }
+    return list(records.values())
+
+def _table_rows(page, columns):
+    """페이지의 괘선 표에서 (순위번호, 등기목적, 내용) 행을 뽑는다.
+    머리행이 없는 표는 앞 페이지 표의 이어지는 부분으로 본다."""
+    eulgu, summary = [], []
+    for table in page.find_tables().tables:
+        cells = table.extract()
+        if not cells:
+            continue
+        header = [re.sub(r"\s", "", c or "") for c in cells[0]]
+        if "순위번호" in header and "등기목적" in header:
+            kind = "summary" if "주요등기사항" in header else "eulgu"
+            detail_col = header.index("주요등기사항") if kind == "summary" else len(header) - 1
+            columns["last"] = (kind, header.index("순위번호"), header.index("등기목적"), detail_col, len(header))
+            cells = cells[1:]
+        elif "last" not in columns or len(cells[0]) != columns["last"][4]:
+            continue
+        kind, rank_col, purpose_col, detail_col, _ = columns["last"]
+        target = summary if kind == "summary" else eulgu
+        for row in cells:
+            if len(row) > detail_col:
+                target.append((row[rank_col] or "", row[purpose_col] or "", row[detail_col] or ""))
+    return eulgu, summary
+
+def _text_rows(page):
+    """괘선이 없는 문서용: get_text("dict") 의 줄을 좌표 순으로 읽어 행을 만든다."""
+    lines = []
+    for block in page.get_text("dict")["blocks"]:
+        for line in block.get("lines", []):
+            text = "".join(span["text"] for span in line["spans"]).strip()
+            if text:
+                lines.append((round(line["bbox"][1]), line["bbox"][0], text))
+    rows = []
+    for _, _, text in sorted(lines):
+        m = re.match(r"^(\d+(?:-\d+)?)\s+(\S*근저당권\S*)", text)
+        if m:
+            rows.append([m.group(1), m.group(2), ""])
+        elif rows:
+            rows[-1][2] += text + "\n"
+    return [tuple(r) for r in rows]
+
+def extract_mortgages(doc, page_texts):
+    """을구와 '주요 등기사항 요약' 표에서 현재 유효한 근저당권 목록을 만든다.
+    요약 표가 있으면 그것을 우선 사용 (요약에는 말소 건이 빠져 있음)."""
+    start = next((i for i, t in enumerate(page_texts) if EULGU_MARKER.search(t)), None)
+    if start is None:
+        return []
+
+    columns = {}
+    eulgu_rows, summary_rows = [], []
+    for i in range(start, len(page_texts)):
+        # 근저당 관련 글자가 없는 페이지는 표 인식을 생략 (업로드 지연 방지)
+        if "근저당" not in page_texts[i]:
+            continue
+        eulgu, summary = _table_rows(doc[i], columns)
+        if not eulgu and not summary and not columns:
+            eulgu = _text_rows(doc[i])
+        eulgu_rows += eulgu
+        summary_rows += summary
+
+    return parse_mortgage_rows(summary_rows or eulgu_rows)
+
+# ------------------------------
+# 🔹 PDF 처리 함수
+# ------------------------------
+
+def pdf_hash(pdf_bytes):
+    return hashlib.sha1(pdf_bytes).hexdigest()
+
+def process_pdf_bytes(pdf_bytes):
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    page_texts = []
+    external_links = []
+
+    for page in doc:
+        page_texts.append(page.get_text("text"))
+        links = page.get_links()
+        for link in links:
+            if "uri" in link:
+                external_links.append(link["uri"])
+
+    mortgages = extract_mortgages(doc, page_texts)
+    doc.close()
+
+    text = "".join(page_texts)
+    address = extract_address(text)
+    area, floor = extract_area_floor(text)
+    co_owners = extract_all_names_and_births(text)
+
+    return text, external_links, address, area, floor, co_owners, mortgages
+
+def process_pdf(uploaded_file):
+    return process_pdf_bytes(uploaded_file.read())
+
+# ------------------------------
+# 🔹 여러 PDF 동시 처리
+# ------------------------------
+
+POOL_WORKERS = min(os.cpu_count() or 1, 8)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def worker_mp_context():
+    # Streamlit 서버는 멀티스레드라 fork 하면 다른 스레드가 잡고 있던 잠금이 복사돼 교착될 수 있음
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def get_pdf_pool():
+    """모든 세션이 함께 쓰는 PDF 파싱 워커 풀 (업로드마다 프로세스를 새로 띄우지 않음)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=POOL_WORKERS, mp_context=worker_mp_context())
+        return _pool
+
+
+def _discard_pool(pool):
+    # 워커가 비정상 종료돼 깨진 풀은 버리고 다음 요청 때 새로 만든다
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+
+def process_pdfs_concurrently(named_pdfs):
+    """(이름, bytes) 목록을 워커 풀에서 병렬 파싱하고, 끝나는 순서대로
+    (이름, 결과, 오류) 를 돌려준다. 전체 시간은 가장 느린 문서 하나에 가깝다."""
+    if not named_pdfs:
+        return
+    # PyMuPDF 파싱은 GIL을 잡고 있으므로 스레드가 아닌 프로세스 풀을 사용
+    for attempt in range(2):
+        pool = get_pdf_pool()
+        try:
+            futures = {
+                pool.submit(process_pdf_bytes, data): name
+                for name, data in named_pdfs
+            }
+            break
+        except BrokenProcessPool:
+            _discard_pool(pool)
+            if attempt:
+                raise
+    for future in as_completed(futures):
+        name = futures[future]
+        try:
+            yield name, future.result(), None
+        except BrokenProcessPool as e:
+            _discard_pool(pool)
+            yield name, None, e
+        except Exception as e:
+            yield name, None, e
@@ -0,0 +1,296 @@
+"""
+고객별 보고서(결과 텍스트 + 수수료) 일괄 내보내기
+
+저장된 이력(고객별 최신 1건)으로 텍스트/XLSX/PDF 보고서를 워커 풀에서 병렬 생성하고,
+완성되는 대로 하나의 zip 파일에 기록한다. 동시에 처리 중인 묶음 수를 제한해
+고객 수가 많아도 메모리에 모든 보고서를 쌓아두지 않는다.
+
+사용법:
+    python report_export.py --out reports.zip --formats txt xlsx pdf --workers 8
+"""
+import io
+import os
+import re
+import hashlib
+import argparse
+import zipfile
+from ast import literal_eval
+from xml.sax.saxutils import escape
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import fitz  # PyMuPDF
+import pandas as pd
+
+from ltv_map import region_map
+from history_manager import HISTORY_FILE
+from pdf_utils import worker_mp_context
+from ltv_report import (
+    to_number,
+    select_ltv_ratios,
+    valid_loan_items,
+    calculate_limits,
+    build_result_text,
+    calculate_fees,
+    build_fee_text,
+    parse_korean_number,
+)
+
+DEFAULT_FORMATS = ("txt", "xlsx", "pdf")
+BATCH_SIZE = 50
+
+
+# ------------------------------
+# 🔹 이력 → 보고서 내용
+# ------------------------------
+
+def latest_records(history_file=HISTORY_FILE):
+    if not os.path.exists(history_file):
+        return []
+    df = pd.read_csv(history_file, dtype=str, keep_default_na=False)
+    if df.empty or "고객명" not in df.columns:
+        return []
+    df = df[df["고객명"].str.strip() != ""]
+    return df.drop_duplicates("고객명", keep="last").to_dict("records")
+
+
+def _loan_items(record):
+    raw = record.get("대출항목", "")
+    try:
+        loans = literal_eval(raw) if raw else []
+    except (ValueError, SyntaxError):
+        loans = []
+    # 이력 저장 형식 → 화면 항목 형식
+    return [
+        {
+            "설정자": str(loan.get("설정자", "")),
+            "채권최고액": str(loan.get("채권최고액", "")),
+            "설정비율": str(loan.get("비율", "")),
+            "원금": str(loan.get("원금", "")),
+            "진행구분": str(loan.get("진행", "")),
+        }
+        for loan in loans
+    ]
+
+
+def _saved_ltvs(record):
+    # LTV 열이 생기기 전에 저장된 행(열이 없거나, 항상 값이 있는 수수료율까지 빈 칸)은 앱 기본값 80%
+    # 그 외 빈 LTV1 은 사용자가 비운 것이므로 앱 화면처럼 제외
+    if "LTV1" not in record or not (record.get("LTV1") or record.get("컨설팅수수료율")):
+        return ["80", ""]
+    return [record.get("LTV1", ""), record.get("LTV2", "")]
+
+
+def _rate(value, default):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def build_customer_report(record):
+    """이력 1건으로 화면의 결과 텍스트와 수수료 내역을 다시 계산한다."""
+    name = record.get("고객명", "")
+    address = record.get("주소", "")
+    kb_price = record.get("KB시세", "")
+    area = record.get("면적", "")
+    floor_match = re.findall(r"제(\d+)층", address)
+    floor_num = int(floor_match[-1]) if floor_match else None
+    deduction = to_number(record.get("방공제")) if record.get("방공제") else region_map.get(record.get("지역", ""), 0)
+
+    items = _loan_items(record)
+    valid_items = valid_loan_items(items)
+    ltv_selected = select_ltv_ratios(_saved_ltvs(record))
+    limit_senior_dict, limit_sub_dict, (sum_dh, sum_sm, _, _) = calculate_limits(
+        parse_korean_number(kb_price), deduction, items, ltv_selected
+    )
+    text = build_result_text(
+        name, address, floor_num, kb_price, area, deduction,
+        valid_items, ltv_selected, limit_senior_dict, limit_sub_dict, sum_dh, sum_sm,
+    )
+
+    fees = calculate_fees(
+        to_number(record.get("컨설팅금액")), _rate(record.get("컨설팅수수료율"), 1.5),
+        to_number(record.get("브릿지금액")), _rate(record.get("브릿지수수료율"), 0.7),
+    )
+    return {
+        "name": name,
+        "text": text + "\n" + build_fee_text(*fees),
+        "items": valid_items,
+        "limits": [("선순위", ltv, *limit_senior_dict[ltv]) for ltv in limit_senior_dict]
+                  + [("후순위", ltv, *limit_sub_dict[ltv]) for ltv in limit_sub_dict],
+        "fees": fees,
+    }
+
+
+# ------------------------------
+# 🔹 파일 형식별 렌더링
+# ------------------------------
+
+_PDF_TEMPLATE = None
+PDF_LINES_PER_PAGE = 50
+
+def _pdf_template():
+    # 한글 CJK 글꼴 등록이 문서당 비용의 대부분이라, 글꼴이 등록된 빈 문서를 한 번만 만들어 재사용
+    global _PDF_TEMPLATE
+    if _PDF_TEMPLATE is None:
+        doc = fitz.open()
+        doc.new_page().insert_font(fontname="korea")
+        _PDF_TEMPLATE = doc.tobytes()
+        doc.close()
+    return _PDF_TEMPLATE
+
+
+def report_to_pdf(report):
+    doc = fitz.open("pdf", _pdf_template())
+    lines = report["text"].splitlines()
+    for n in range(0, max(len(lines), 1), PDF_LINES_PER_PAGE):
+        page = doc[0] if n == 0 else doc.new_page()
+        chunk = "\n".join(lines[n:n + PDF_LINES_PER_PAGE])
+        page.insert_text((40, 50), chunk, fontname="korea", fontsize=10, lineheight=1.5)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+# 보고서 시트는 단순한 표라서 openpyxl 없이 최소 구성의 XLSX 패키지를 직접 작성 (고객당 수 ms → 1ms 미만)
+XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="보고서" sheetId="1" r:id="rId1"/></sheets></workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def _xlsx_cell(value):
+    if isinstance(value, (int, float)):
+        return f"<c><v>{value}</v></c>"
+    return f'<c t="inlineStr"><is><t>{escape(str(value))}</t></is></c>'
+
+
+def report_to_xlsx(report):
+    rows = [["고객명", report["name"]], [], ["설정자", "채권최고액", "설정비율", "원금", "진행구분"]]
+    for item in report["items"]:
+        rows.append([item["설정자"], to_number(item["채권최고액"]), item["설정비율"], to_number(item["원금"]), item["진행구분"]])
+    rows += [[], ["구분", "LTV(%)", "한도", "가용"]]
+    rows += [list(row) for row in report["limits"]]
+    consult_fee, bridge_fee, total_fee = report["fees"]
+    rows += [[], ["컨설팅 수수료", consult_fee], ["브릿지 수수료", bridge_fee], ["수수료 합계", total_fee]]
+
+    sheet_rows = "".join(f"<row>{''.join(_xlsx_cell(v) for v in row)}</row>" for row in rows)
+    sheet = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        f"<sheetData>{sheet_rows}</sheetData></worksheet>"
+    )
+
+    buffer = io.BytesIO()
+    # 바깥 zip 에서 한 번 더 압축하므로 여기서는 무압축
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as xlsx:
+        for name, xml in XLSX_PARTS.items():
+            xlsx.writestr(name, xml)
+        xlsx.writestr("xl/worksheets/sheet1.xml", sheet)
+    return buffer.getvalue()
+
+
+def _safe_filename(name):
+    safe = re.sub(r'[\\/:*?"<>|\s]+', "_", name).strip("_") or "고객"
+    if safe != name:
+        # 바꾼 문자 때문에 다른 고객과 폴더명이 겹치지 않도록 원래 이름의 짧은 해시를 붙임
+        # (예: "홍길동 1" / "홍길동/1") — 고객명은 latest_records 에서 이미 고유
+        safe += "_" + hashlib.sha1(name.encode("utf-8")).hexdigest()[:6]
+    return safe
+
+
+def render_batch(records, formats):
+    """워커에서 실행: 고객 묶음의 (zip 내 경로, bytes) 목록을 만든다."""
+    files = []
+    for record in records:
+        report = build_customer_report(record)
+        base = _safe_filename(report["name"])
+        if "txt" in formats:
+            files.append((f"{base}/{base}.txt", report["text"].encode("utf-8")))
+        if "xlsx" in formats:
+            files.append((f"{base}/{base}.xlsx", report_to_xlsx(report)))
+        if "pdf" in formats:
+            files.append((f"{base}/{base}.pdf", report_to_pdf(report)))
+    return files
+
+
+# ------------------------------
+# 🔹 병렬 내보내기
+# ------------------------------
+
+def export_reports_zip(dest, formats=DEFAULT_FORMATS, max_workers=None, history_file=HISTORY_FILE, progress=None):
+    """dest(경로 또는 파일 객체)에 zip 을 쓰고 내보낸 고객 수를 반환한다.
+    progress(done, total) 콜백으로 진행 상황을 알린다."""
+    records = latest_records(history_file)
+    batches = [records[i:i + BATCH_SIZE] for i in range(0, len(records), BATCH_SIZE)]
+    workers = max_workers or min(os.cpu_count() or 1, 8)
+    done = 0
+
+    # Streamlit 서버 스레드에서 호출되므로 fork 대신 forkserver/spawn 워커 사용
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=worker_mp_context())
+    with zipfile.ZipFile(dest, "w", zipfile.ZIP_DEFLATED) as zf, pool:
+        pending = {}
+        queue = iter(batches)
+
+        def submit_next():
+            batch = next(queue, None)
+            if batch is not None:
+                pending[pool.submit(render_batch, batch, tuple(formats))] = len(batch)
+
+        # 작업 중인 묶음을 워커 수의 2배로 제한 → 메모리 사용량 일정
+        for _ in range(workers * 2):
+            submit_next()
+
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                count = pending.pop(future)
+                for arcname, data in future.result():
+                    zf.writestr(arcname, data)
+                done += count
+                if progress:
+                    progress(done, len(records))
+                submit_next()
+
+    return done
+
+
+def main():
+    parser = argparse.ArgumentParser(description="고객별 보고서 일괄 내보내기")
+    parser.add_argument("--out", default="ltv_reports.zip")
+    parser.add_argument("--formats", nargs="+", choices=["txt", "xlsx", "pdf"], default=list(DEFAULT_FORMATS))
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--history", default=HISTORY_FILE)
+    args = parser.parse_args()
+
+    count = export_reports_zip(args.out, args.formats, args.workers, args.history)
+    print(f"✅ {count}명 보고서를 {args.out} 에 저장했습니다.")
+
+
+if __name__ == "__main__":
+    main()
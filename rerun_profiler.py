@@ -0,0 +1,150 @@
+"""
+rerun 단위 샘플링 프로파일러 (선택 사용)
+
+환경변수 LTV_PROFILE=1 또는 URL 쿼리 ?profile=1 일 때만 동작한다.
+스크립트 실행 스레드의 호출 스택을 일정 간격으로 샘플링해 collapsed stack
+(flamegraph.pl / speedscope 에서 바로 열 수 있는 형식)으로 저장한다.
+
+    profiles/recent/   최근 LTV_PROFILE_KEEP 개 (기본 50)
+    profiles/slowest/  가장 느렸던 LTV_PROFILE_SLOWEST 개 (기본 20)
+
+파일명: {소요ms}ms_{시각}_{업로드 해시}_{고객명}.folded
+예외/st.stop/st.rerun 으로 스크립트가 끝까지 가지 못한 rerun 은 샘플링 스레드가
+스크립트 종료를 감지해 직접 저장한다 (파일명 끝 _aborted).
+"""
+import os
+import re
+import sys
+import time
+import shutil
+import threading
+from collections import Counter
+from datetime import datetime
+
+PROFILE_DIR = os.getenv("LTV_PROFILE_DIR", "profiles")
+PROFILE_INTERVAL = float(os.getenv("LTV_PROFILE_INTERVAL_MS", "5")) / 1000
+PROFILE_KEEP = int(os.getenv("LTV_PROFILE_KEEP", "50"))
+PROFILE_SLOWEST = int(os.getenv("LTV_PROFILE_SLOWEST", "20"))
+MAX_SAMPLING_SECONDS = 300  # 스크립트가 끝나지 않아도 샘플링 스레드가 끝나도록
+
+_save_lock = threading.Lock()  # 여러 세션이 같은 폴더를 정리하므로 저장/정리는 한 번에 하나씩
+
+
+def profiling_enabled(query_params=None):
+    if os.getenv("LTV_PROFILE", "") in ("1", "true", "yes"):
+        return True
+    return bool(query_params) and query_params.get("profile") in ("1", "true")
+
+
+class RerunProfiler:
+    def __init__(self, interval=PROFILE_INTERVAL, script_code=None, upload_hash=None, customer=None):
+        self.interval = interval
+        self.samples = Counter()
+        self.target = threading.get_ident()
+        # 이 코드 객체가 스택에서 사라지면 스크립트 실행이 (정상/예외 무관) 끝난 것
+        self.script_code = script_code
+        self.upload_hash = upload_hash
+        self.customer = customer
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, name="ltv-rerun-profiler", daemon=True)
+        self.started = None
+        self.elapsed = None
+        self.aborted = False
+
+    def _sample(self):
+        deadline = time.perf_counter() + MAX_SAMPLING_SECONDS
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            stack = []
+            in_script = self.script_code is None
+            while frame is not None:
+                code = frame.f_code
+                in_script = in_script or code is self.script_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if not in_script or time.perf_counter() > deadline:
+                self._abort()
+                return
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def _abort(self):
+        # finish_rerun_profiler 에 도달하지 못한 rerun → 샘플링 스레드에서 바로 저장
+        self.elapsed = time.perf_counter() - self.started
+        self.aborted = True
+        self._stop.set()
+        save_profile(self, self.upload_hash, self.customer)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        if not self.aborted:
+            self.elapsed = time.perf_counter() - self.started
+        return self
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+def _safe_tag(value):
+    return re.sub(r'[\\/:*?"<>|\s]+', "_", str(value or "")).strip("_")[:40] or "none"
+
+
+def _prune(directory, keep, key=None):
+    names = sorted(os.listdir(directory), key=key)
+    for name in names[:max(len(names) - keep, 0)]:
+        os.remove(os.path.join(directory, name))
+
+
+def save_profile(profiler, upload_hash=None, customer=None, directory=PROFILE_DIR):
+    """collapsed stack 파일을 저장하고 경로를 반환한다. 샘플이 없으면 None."""
+    if not profiler.samples:
+        return None
+    recent_dir = os.path.join(directory, "recent")
+    slowest_dir = os.path.join(directory, "slowest")
+    os.makedirs(recent_dir, exist_ok=True)
+    os.makedirs(slowest_dir, exist_ok=True)
+
+    elapsed_ms = int(profiler.elapsed * 1000)
+    name = (
+        f"{elapsed_ms:08d}ms_{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}_"
+        f"{_safe_tag(upload_hash)[:12]}_{_safe_tag(customer)}{'_aborted' if profiler.aborted else ''}.folded"
+    )
+    path = os.path.join(recent_dir, name)
+    with _save_lock:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(profiler.collapsed())
+        _prune(recent_dir, PROFILE_KEEP, key=lambda n: os.path.getmtime(os.path.join(recent_dir, n)))
+
+        current = sorted(os.listdir(slowest_dir))
+        if len(current) < PROFILE_SLOWEST or name > current[0]:
+            shutil.copyfile(path, os.path.join(slowest_dir, name))
+            # 파일명이 0으로 채운 소요시간으로 시작하므로 이름순 = 빠른 순
+            _prune(slowest_dir, PROFILE_SLOWEST)
+    return path
+
+
+# ------------------------------
+# 🔹 app.py 에서 사용하는 진입점
+# ------------------------------
+
+def start_rerun_profiler(query_params=None, upload_hash=None, customer=None):
+    """app.py 최상위에서 호출. 태그는 rerun 이 중단됐을 때 파일명에 쓰인다."""
+    if not profiling_enabled(query_params):
+        return None
+    script_code = sys._getframe(1).f_code
+    return RerunProfiler(script_code=script_code, upload_hash=upload_hash, customer=customer).start()
+
+
+def finish_rerun_profiler(profiler, upload_hash=None, customer=None):
+    if profiler is None:
+        return None
+    profiler.stop()
+    if profiler.aborted:
+        return None  # 샘플링 스레드가 이미 저장함
+    return save_profile(profiler, upload_hash, customer)
@@ -0,0 +1,131 @@
+"""
+프로세스 전역 공유 캐시 (모든 세션/rerun 이 함께 사용)
+
+- 메모리 한도(LTV_CACHE_MAX_MB, 기본 64MB)를 넘으면 오래 안 쓴 항목부터 제거 (LRU)
+- 같은 키를 여러 세션이 동시에 요청해도 디스크 읽기/파싱은 한 번만
+- 이력 스냅샷은 파일 mtime/크기 + 버전 카운터를 키에 포함해 저장/삭제 즉시 무효화
+- 반환값은 여러 세션이 공유하므로 수정하지 말고 읽기 전용으로 사용할 것
+"""
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+CACHE_MAX_BYTES = int(float(os.getenv("LTV_CACHE_MAX_MB", "64")) * 2**20)
+
+
+def estimate_size(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(sys.getsizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class SharedCache:
+    def __init__(self, max_bytes=CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key → (value, size)
+        self._loading = {}  # key → 로딩 중 잠금
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_load(self, key, loader):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            key_lock = self._loading.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # 기다리는 동안 다른 세션이 채웠으면 그대로 사용
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._entries[key][0]
+                self.misses += 1
+
+            try:
+                value = loader()
+                self._store(key, value)
+            finally:
+                with self._lock:
+                    self._loading.pop(key, None)
+            return value
+
+    def _store(self, key, value):
+        size = estimate_size(value)
+        with self._lock:
+            if size > self.max_bytes:
+                return  # 한도보다 큰 값은 캐시하지 않음
+            # 제거된 키를 두 로더가 연달아 채우는 경우 기존 항목 크기를 빼고 교체
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def invalidate(self, namespace=None):
+        """namespace(키의 첫 요소)가 같은 항목만, 없으면 전체 제거."""
+        with self._lock:
+            for key in [k for k in self._entries if namespace is None or k[0] == namespace]:
+                self._bytes -= self._entries.pop(key)[1]
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+shared_cache = SharedCache()
+
+# ------------------------------
+# 🔹 이력 파일 버전
+# ------------------------------
+
+_history_version = 0
+_version_lock = threading.Lock()
+
+
+def bump_history_version():
+    global _history_version
+    with _version_lock:
+        _history_version += 1
+    shared_cache.invalidate("history")
+
+
+def file_key(namespace, path, *extra):
+    """(namespace, 경로, mtime, 크기, ...) — 다른 프로세스가 파일을 바꿔도 mtime 으로 감지."""
+    try:
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        stamp = (None, None)
+    return (namespace, path, *stamp, *extra)
+
+
+def history_key(path, *extra):
+    return file_key("history", path, _history_version, *extra)
+
+
+def cache_stats():
+    return shared_cache.stats()
@@ -0,0 +1,154 @@
+import random
+
+import fitz  # PyMuPDF
+
+# 합성 등기부등본 생성기 (부하 테스트/벤치마크용, 실제 개인정보 없음)
+
+LAST_NAMES = ["김", "이", "박", "최", "정", "강", "조", "윤", "장", "임"]
+FIRST_NAMES = ["민준", "서연", "도윤", "지우", "하준", "서윤", "지호", "하은", "준서", "수아"]
+LENDERS = ["국민은행", "신한은행", "우리은행", "하나은행", "농협은행", "새마을금고", "신협", "삼성생명"]
+DISTRICTS = ["강남구 역삼동", "서초구 서초동", "송파구 잠실동", "마포구 공덕동", "노원구 상계동"]
+
+EULGU_HEADER = ["순위번호", "등기목적", "접수", "등기원인", "권리자 및 기타사항"]
+SUMMARY_HEADER = ["순위번호", "등기목적", "접수정보", "주요등기사항", "대상소유자"]
+EULGU_WIDTHS = [50, 110, 90, 90, 175]
+SUMMARY_WIDTHS = [50, 80, 85, 225, 75]
+ROW_HEIGHT = 48
+PAGE_BOTTOM = 790
+
+
+def random_registry(seed=0, loans=3, owners=1, cancelled=0):
+    """문서에 들어갈 값을 먼저 만들어 두고, 추출 결과와 비교할 정답으로도 사용.
+    cancelled 개의 근저당권은 말소된 것으로 기록된다."""
+    rng = random.Random(seed)
+    floor = rng.randint(1, 25)
+    address = (
+        f"서울특별시 {rng.choice(DISTRICTS)} {rng.randint(1, 999)} "
+        f"제{rng.randint(101, 120)}동 제{floor}층 제{floor}{rng.randint(1, 9):02d}호"
+    )
+    total = loans + cancelled
+    cancelled_ranks = set(rng.sample(range(1, total + 1), cancelled))
+    return {
+        "address": address,
+        "area": f"{rng.randint(40, 160)}.{rng.randint(10, 99)}㎡",
+        "floor": floor,
+        "owners": [
+            (rng.choice(LAST_NAMES) + rng.choice(FIRST_NAMES), f"{rng.randint(50, 99)}{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}")
+            for _ in range(owners)
+        ],
+        "loans": [
+            {
+                "순위번호": str(rank),
+                "설정자": rng.choice(LENDERS),
+                "채권최고액": rng.randint(5, 90) * 1200,  # 만원 단위
+                "말소": rank in cancelled_ranks,
+            }
+            for rank in range(1, total + 1)
+        ],
+    }
+
+
+def active_loans(registry):
+    return [loan for loan in registry["loans"] if not loan["말소"]]
+
+
+def _eulgu_rows(registry):
+    owner = registry["owners"][0][0] if registry["owners"] else ""
+    rows = []
+    for loan in registry["loans"]:
+        rows.append([
+            loan["순위번호"],
+            "근저당권설정",
+            f"2020년{loan['순위번호']}월2일\n제{10000 + int(loan['순위번호'])}호",
+            "2020년3월2일\n설정계약",
+            f"채권최고액 금{loan['채권최고액'] * 10000:,}원\n채무자 {owner}\n근저당권자 주식회사{loan['설정자']}",
+        ])
+    next_rank = len(registry["loans"]) + 1
+    for loan in registry["loans"]:
+        if loan["말소"]:
+            rows.append([
+                str(next_rank),
+                f"{loan['순위번호']}번근저당권설정\n등기말소",
+                f"2023년5월9일\n제{20000 + next_rank}호",
+                "2023년5월9일\n해지",
+                "",
+            ])
+            next_rank += 1
+    return rows
+
+
+def _summary_rows(registry):
+    owner = registry["owners"][0][0] if registry["owners"] else ""
+    return [
+        [
+            loan["순위번호"],
+            "근저당권설정",
+            f"2020년{loan['순위번호']}월2일\n제{10000 + int(loan['순위번호'])}호",
+            f"채권최고액 금{loan['채권최고액'] * 10000:,}원\n근저당권자 주식회사{loan['설정자']}",
+            owner,
+        ]
+        for loan in active_loans(registry)
+    ]
+
+
+def make_registry_pdf(registry, filler_pages=2, tables=True):
+    """tables=False 이면 을구를 괘선 없는 텍스트로만 기록 (표 인식 실패 경로 확인용)."""
+    doc = fitz.open()
+
+    def write_lines(page, lines, top=60):
+        y = top
+        for line in lines:
+            page.insert_text((40, y), line, fontname="korea", fontsize=10)
+            y += 16
+        return y
+
+    def draw_table(page, y, header, rows, widths):
+        for cells in [header] + rows:
+            if y + ROW_HEIGHT > PAGE_BOTTOM:
+                page = doc.new_page()
+                y = 60
+            x = 40
+            for width, cell in zip(widths, cells):
+                page.draw_rect(fitz.Rect(x, y, x + width, y + ROW_HEIGHT), color=(0, 0, 0), width=0.5)
+                for n, line in enumerate(cell.split("\n")):
+                    page.insert_text((x + 3, y + 12 + n * 12), line, fontname="korea", fontsize=8)
+                x += width
+            y += ROW_HEIGHT
+        return page, y
+
+    page = doc.new_page()
+    write_lines(page, [
+        "등기사항전부증명서(말소사항 포함) - 집합건물",
+        f"[집합건물] {registry['address']}",
+        "【 표 제 부 】 ( 전유부분의 건물의 표시 )",
+        f"철근콘크리트구조 {registry['area']}",
+    ])
+
+    for n in range(filler_pages):
+        page = doc.new_page()
+        write_lines(page, [f"【 갑 구 】 ( 소유권에 관한 사항 ) {n + 1}"] + ["-" * 60] * 10)
+
+    page = doc.new_page()
+    y = write_lines(page, ["【 을 구 】 ( 소유권 이외의 권리에 관한 사항 )"])
+    if tables:
+        draw_table(page, y, EULGU_HEADER, _eulgu_rows(registry), EULGU_WIDTHS)
+    else:
+        lines = []
+        for rank, purpose, _, _, detail in _eulgu_rows(registry):
+            lines.append(f"{rank} {purpose.replace(chr(10), '')}")
+            lines += detail.split("\n") if detail else []
+        write_lines(page, lines, top=y)
+
+    page = doc.new_page()
+    lines = ["주요 등기사항 요약 (참고용)"]
+    for name, birth in registry["owners"]:
+        role = "공유자" if len(registry["owners"]) > 1 else "소유자"
+        lines += [f"{name} ({role})", f"{birth}-*******"]
+    lines.append("3. (근)저당권 및 전세권 등 ( 을구 )")
+    y = write_lines(page, lines)
+    if tables:
+        draw_table(page, y, SUMMARY_HEADER, _summary_rows(registry), SUMMARY_WIDTHS)
+
+    data = doc.tobytes()
+    doc.close()
+    return data